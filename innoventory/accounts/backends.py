@@ -0,0 +1,56 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db import router
+
+from core import cache as app_cache
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose per-request user lookup is served from the cache.
+
+    The user row is cached for USER_CACHE_TTL seconds in the "users" cache
+    namespace, which every CustomUser save or delete bumps (profile edits,
+    role or active changes, password changes, last_login updates). The bump
+    reaches other workers through the namespace broadcast, so
+    AuthenticationMiddleware no longer costs a query on every request.
+
+    The password hash never goes into the cache, which may be a file or a
+    network service: the entry holds the other fields plus the session auth
+    hash, and the rebuilt user has password deferred.
+    """
+
+    def _load_user(self, user_id):
+        user = super().get_user(user_id)
+        if user is None:
+            return None
+        return {
+            'fields': {
+                field.attname: getattr(user, field.attname)
+                for field in user._meta.concrete_fields if field.attname != 'password'
+            },
+            'session_auth_hash': user.get_session_auth_hash(),
+        }
+
+    def _cached_user(self, user_id):
+        row = app_cache.get_or_set(
+            'users', f'user:{user_id}', lambda: self._load_user(user_id),
+            getattr(settings, 'USER_CACHE_TTL', 300),
+        )
+        if row is None:
+            return None
+        UserModel = get_user_model()
+        fields = row['fields']
+        user = UserModel.from_db(router.db_for_read(UserModel), list(fields), list(fields.values()))
+        user._cached_session_auth_hash = row['session_auth_hash']
+        return user
+
+    def get_user(self, user_id):
+        user = self._cached_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        user = await sync_to_async(self._cached_user)(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
@@ -1,7 +1,17 @@
 from functools import wraps
+from asgiref.sync import iscoroutinefunction
 from django.core.exceptions import PermissionDenied
 
 def admin_required(view_func):
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            user = await request.auser()
+            if not user.is_authenticated or user.role != "admin":
+                raise PermissionDenied
+            return await view_func(request, *args, **kwargs)
+        return wrapper
+
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
         if not request.user.is_authenticated or request.user.role != "admin":
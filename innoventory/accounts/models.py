@@ -10,6 +10,14 @@ class CustomUser(AbstractUser):
     phone_number = models.CharField(max_length=15, unique=True)
     email = models.EmailField(unique=True)
 
+    def get_session_auth_hash(self):
+        # Users served by CachedModelBackend come without their password hash
+        # and carry the session hash computed when the row was loaded instead.
+        cached = getattr(self, '_cached_session_auth_hash', None)
+        if cached is not None and 'password' in self.get_deferred_fields():
+            return cached
+        return super().get_session_auth_hash()
+
     def can_be_deleted(self):
         from sales.models import Sale
         return not Sale.objects.filter(sold_by=self).exists()
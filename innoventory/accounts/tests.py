@@ -1,3 +1,93 @@
-from django.test import TestCase
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
 
-# Create your tests here.
+from core import cache as app_cache
+from core.concurrency import gather_queries, run_queries
+from products.models import Category, Product
+from sales.services import checkout_cart
+from suppliers.models import Supplier
+
+from . import views
+from .backends import CachedModelBackend
+from .models import CustomUser
+
+
+class CachedModelBackendTests(TestCase):
+    def setUp(self):
+        # Cached users outlive a test: TestCase never commits, so no bump clears them.
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='clerk', email='clerk@test.local', phone_number='1', password='old-secret',
+        )
+
+    def test_cache_entry_holds_no_password_hash(self):
+        user = CachedModelBackend().get_user(self.user.pk)
+
+        entry = app_cache.get_value('users', f'user:{self.user.pk}')
+        self.assertNotIn('password', entry['fields'])
+        self.assertNotIn(self.user.password, repr(entry))
+        self.assertEqual(user.username, 'clerk')
+        self.assertEqual(user.get_session_auth_hash(), self.user.get_session_auth_hash())
+        # Reading the password itself still works, straight from the database.
+        self.assertTrue(user.check_password('old-secret'))
+
+    def test_password_change_invalidates_existing_sessions(self):
+        self.client.login(username='clerk', password='old-secret')
+        self.assertEqual(self.client.get(reverse('staff_dashboard')).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password('new-secret')
+            self.user.save()
+
+        response = self.client.get(reverse('staff_dashboard'))
+        self.assertRedirects(response, f"{reverse('login')}?next={reverse('staff_dashboard')}", fetch_redirect_response=False)
+
+
+class DashboardTests(TransactionTestCase):
+    """The async dashboards run their parts on the query pool, whose threads hold their own connections."""
+
+    def setUp(self):
+        cache.clear()
+        supplier = Supplier.objects.create(name='Supplier', contact='n/a', email='s@test.local')
+        category = Category.objects.create(name='Grains')
+        rice = Product.objects.create(name='Rice', category=category, supplier=supplier, price=10, stock_quantity=50)
+        soap = Product.objects.create(name='Soap', category=category, supplier=supplier, price=4, stock_quantity=50)
+        Product.objects.create(name='Salt', category=category, supplier=supplier, price=2, stock_quantity=50)
+        checkout_cart([(rice.pk, 2), (soap.pk, 3)], 'cash')
+        checkout_cart([(soap.pk, 1)], 'cash')
+
+    def assertPartsMatch(self, parts):
+        self.assertEqual(async_to_sync(gather_queries)(parts()), run_queries(parts()))
+
+    def test_admin_parts_match_sequential_run(self):
+        filters = {'start_date': '', 'end_date': '', 'product': '', 'category': ''}
+        self.assertPartsMatch(lambda: views._admin_dashboard_parts(filters))
+
+    def test_staff_parts_match_sequential_run(self):
+        self.assertPartsMatch(lambda: views._staff_dashboard_parts(timezone.localtime().date()))
+
+    def test_async_dashboards_render_the_same_totals(self):
+        admin = CustomUser.objects.create(username='boss', email='boss@test.local', phone_number='2', role='admin')
+        self.client.force_login(admin)
+        for sync_name, async_name, keys in (
+            ('admin_dashboard', 'admin_dashboard_async',
+             ('total_revenue', 'total_sales', 'unique_products', 'top_selling', 'low_performing', 'revenue_data')),
+            ('staff_dashboard', 'staff_dashboard_async',
+             ('today_sales_count', 'today_revenue', 'out_of_stock', 'pending_credits', 'revenue_data')),
+        ):
+            expected = self.client.get(reverse(sync_name)).context
+            response = self.client.get(reverse(async_name))
+            self.assertEqual(response.status_code, 200)
+            for key in keys:
+                self.assertEqual(response.context[key], expected[key], key)
+        self.assertEqual(response.context['today_revenue'], 36)
+        self.assertEqual(response.context['today_sales_count'], 2)
+
+    def test_anonymous_users_are_sent_to_login(self):
+        for name in ('staff_dashboard', 'staff_dashboard_async'):
+            url = reverse(name)
+            response = self.client.get(url)
+            self.assertRedirects(response, f"{reverse('login')}?next={url}", fetch_redirect_response=False)
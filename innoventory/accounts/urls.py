@@ -8,6 +8,9 @@ urlpatterns = [
     path('dashboard/', views.dashboard, name='dashboard'),
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
     path('staff-dashboard/', views.staff_dashboard, name='staff_dashboard'),
+    # Async variants: run the dashboard queries concurrently (serve via ASGI).
+    path('admin-dashboard/async/', views.admin_dashboard_async, name='admin_dashboard_async'),
+    path('staff-dashboard/async/', views.staff_dashboard_async, name='staff_dashboard_async'),
     path('logout/', LogoutView.as_view(), name='logout'),
     path('users/', views.user_list, name='user_list'),
     path('users/delete/<int:user_id>/', views.delete_user, name='delete_user'),
@@ -1,16 +1,22 @@
 from django.contrib.auth import views as auth_views
+from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.shortcuts import render, redirect, get_object_or_404
 from .models import CustomUser
 from .forms import RegisterForm
 from django.db.models import Sum, Count, Q
 from products.models import Product
-from sales.models import Sale
+from sales.models import Sale, SaleLine
+from sales.services import credit_summary
+from core.badges import get_badge_counts
 from django.db.models.functions import TruncDate, TruncHour
 from django.utils import timezone
 from datetime import timedelta, datetime, time
-from products.models import Product, StockTransaction, Category
+from products.models import Product, StockTransaction
 from .decorators import admin_required
+from products.categories import get_categories
+from asgiref.sync import sync_to_async
+from core.concurrency import gather_queries, run_queries
 
 def unauthorized_view(request, exception=None):
     return render(request, "unauthorized.html", status=403)
@@ -35,218 +41,196 @@ def dashboard(request):
     # Fallback for other users
     return render(request, 'accounts/generic_user_dashboard.html', {})
 
-def get_overdue_summary(limit=5):
-    today = timezone.localtime().date()
-    overdue = Sale.objects.filter(
-        sales_type='credit',
-        due_date__lt=today,
-        balance__gt=0
-    ).select_related('product_sold')[:limit]
+def _percent_change(current, previous):
+    return (current - previous) / previous * 100 if previous else 0
 
-    for sale in overdue:
-        sale.days_overdue_calculated = (today - sale.due_date).days if sale.due_date else None
 
-    return overdue
+def _admin_dashboard_filters(request):
+    return {
+        'start_date': request.GET.get('start_date') or '',
+        'end_date': request.GET.get('end_date') or '',
+        'product': request.GET.get('product', '').strip(),
+        'category': request.GET.get('category', '').strip(),
+    }
 
 
-@admin_required
-def admin_dashboard(request):
-    # Get date filters
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    product_q = request.GET.get('product', '').strip()
-    category_q = request.GET.get('category', '').strip()
-
-    sales_qs = Sale.objects.select_related('product_sold', 'product_sold__category')
-    if start_date:
-        sales_qs = sales_qs.filter(sales_date__date__gte=start_date)
-    if end_date:
-        sales_qs = sales_qs.filter(sales_date__date__lte=end_date)
-    if product_q:
-        sales_qs = sales_qs.filter(product_sold__name__icontains=product_q)
-    if category_q:
-        sales_qs = sales_qs.filter(product_sold__category__name__icontains=category_q)
-
-    # High-Level KPIs
-    total_revenue = sales_qs.aggregate(total=Sum('total'))['total'] or 0
-    total_sales = sales_qs.count()
-    unique_products = sales_qs.values('product_sold').distinct().count()
-    low_stock_products = Product.objects.low_stock().order_by('stock_quantity')
-    low_stock_count = low_stock_products.count()
-    pending_credits = Sale.objects.filter(
-        sales_type='credit'
-    ).exclude(
-        payment_status='paid'
-    ).count()
-
-    # Top selling products overall
-    top_selling = (
-        sales_qs
-        .values('product_sold__name', 'product_sold__category__name')
-        .annotate(
-            total_qty=Sum('product_qty'),
-            total_revenue=Sum('total')
-        )
-        .order_by('-total_qty')[:3]
-    )
-
-    # Top performing category
-    top_category = (
-        sales_qs
-        .values('product_sold__category__name')
-        .annotate(
-            total_revenue=Sum('total'),
-            total_sales=Count('sale_id')
-        )
-        .order_by('-total_revenue')
-        .first()
-    )
-
-    # Chart Data - Daily Sales & Revenue Trends
-    sales_trend = (
-        sales_qs
-        .annotate(date=TruncDate('sales_date'))
-        .values('date')
-        .annotate(
-            daily_sales=Count('sale_id'),
-            daily_revenue=Sum('total')
-        )
-        .order_by('date')
-    )
+def _admin_dashboard_parts(filters):
+    """The admin dashboard's independent queries, each returning evaluated data."""
+    # Aggregated per SaleLine so cart sales count under each product they contain.
+    lines_qs = SaleLine.objects.all()
+    if filters['start_date']:
+        lines_qs = lines_qs.filter(sale__sales_date__date__gte=filters['start_date'])
+    if filters['end_date']:
+        lines_qs = lines_qs.filter(sale__sales_date__date__lte=filters['end_date'])
+    if filters['product']:
+        lines_qs = lines_qs.filter(product__name__icontains=filters['product'])
+    if filters['category']:
+        lines_qs = lines_qs.filter(product__category__name__icontains=filters['category'])
+
+    return {
+        # High-Level KPIs
+        'kpis': lambda: lines_qs.aggregate(
+            total_revenue=Sum('line_total'),
+            total_sales=Count('sale', distinct=True),
+            unique_products=Count('product', distinct=True),
+        ),
+        'badges': get_badge_counts,
+        'credit_summary': credit_summary,
+        # Top selling products overall
+        'top_selling': lambda: list(
+            lines_qs
+            .values('product__name', 'product__category__name')
+            .annotate(total_qty=Sum('quantity'), total_revenue=Sum('line_total'))
+            .order_by('-total_qty')[:3]
+        ),
+        # Top performing category
+        'top_category': lambda: (
+            lines_qs
+            .values('product__category__name')
+            .annotate(total_revenue=Sum('line_total'), total_sales=Count('sale', distinct=True))
+            .order_by('-total_revenue')
+            .first()
+        ),
+        # Chart Data - Daily Sales & Revenue Trends
+        'sales_trend': lambda: list(
+            lines_qs
+            .annotate(date=TruncDate('sale__sales_date'))
+            .values('date')
+            .annotate(daily_sales=Count('sale', distinct=True), daily_revenue=Sum('line_total'))
+            .order_by('date')
+        ),
+        # Low performing products (no sales in period)
+        'low_performing': lambda: list(
+            Product.objects
+            .exclude(pk__in=lines_qs.values('product'))
+            .values('name', 'category__name', 'stock_quantity')
+            .order_by('name')[:5]
+        ),
+        'categories': get_categories,
+        'products': lambda: list(Product.objects.order_by('name')[:100]),
+    }
+
 
-    chart_dates = [item['date'].strftime('%Y-%m-%d') for item in sales_trend]
-    sales_data = [item['daily_sales'] for item in sales_trend]
-    revenue_data = [float(item['daily_revenue'] or 0) for item in sales_trend]
+def _admin_dashboard_context(filters, results):
+    sales_trend = results['sales_trend']
 
-    # Business Insights
+    # Business Insights: compare the last two days
     if len(sales_trend) >= 2:
-        # Compare last two days
-        sales_trend = list(sales_trend)
-        today_item = sales_trend[-1]
-        yesterday_item = sales_trend[-2]
-        revenue_change = ((today_item['daily_revenue'] - yesterday_item['daily_revenue']) / yesterday_item['daily_revenue'] * 100
-                        if yesterday_item['daily_revenue'] else 0)
-        sales_change = ((today_item['daily_sales'] - yesterday_item['daily_sales']) / yesterday_item['daily_sales'] * 100
-                    if yesterday_item['daily_sales'] else 0)
+        today_item, yesterday_item = sales_trend[-1], sales_trend[-2]
+        revenue_change = _percent_change(today_item['daily_revenue'], yesterday_item['daily_revenue'])
+        sales_change = _percent_change(today_item['daily_sales'], yesterday_item['daily_sales'])
     else:
         revenue_change = 0
         sales_change = 0
 
-    # Low performing products (no sales in period)
-    low_performing = (
-        Product.objects
-        .exclude(sales__in=sales_qs)
-        .values('name', 'category__name', 'stock_quantity')
-        .order_by('name')[:5]
-    )
+    kpis = results['kpis']
+    return {
+        'total_revenue': kpis['total_revenue'] or 0,
+        'total_sales': kpis['total_sales'],
+        'unique_products': kpis['unique_products'],
+        'low_stock_count': results['badges']['low_stock'],
+        'pending_credits': results['credit_summary']['pending_count'],
+        'credit_summary': results['credit_summary'],
 
-    today = timezone.now().date()
-    overdue_summary = get_overdue_summary()
+        'top_selling': results['top_selling'],
+        'top_category': results['top_category'],
+
+        'chart_dates': [item['date'].strftime('%Y-%m-%d') for item in sales_trend],
+        'sales_data': [item['daily_sales'] for item in sales_trend],
+        'revenue_data': [float(item['daily_revenue'] or 0) for item in sales_trend],
 
-    context = {
-        'overdue_summary': overdue_summary,
-        'total_revenue': total_revenue,
-        'total_sales': total_sales,
-        'unique_products': unique_products,
-        'low_stock_count': low_stock_count,
-        'pending_credits': pending_credits,
-        
-        'top_selling': top_selling,
-        'top_category': top_category,
-        
-        'chart_dates': chart_dates,
-        'sales_data': sales_data,
-        'revenue_data': revenue_data,
-        
         'revenue_change': revenue_change,
         'sales_change': sales_change,
-        'low_performing': low_performing,
-        
-        'filters': {
-            'start_date': start_date if start_date else '',
-            'end_date': end_date if end_date else '',
-            'product': product_q,
-            'category': category_q,
-        },
-        
-        'categories': Category.objects.order_by('name'),
-        'products': Product.objects.order_by('name')[:100],
-    }
-
-    return render(request, 'accounts/admin_dashboard.html', context)
+        'low_performing': results['low_performing'],
 
+        'filters': filters,
 
-def staff_dashboard(request):
-    # Get today's date (in local timezone)
-    now = timezone.localtime()
-    today = now.date()
-    yesterday = today - timedelta(days=1)
-
-    today_sales = Sale.objects.filter(sales_date__date=today)
-    today_sales_count = today_sales.count()
-    today_revenue = today_sales.aggregate(total=Sum('total'))['total'] or 0
+        'categories': results['categories'],
+        'products': results['products'],
+    }
 
-    yesterday_sales = Sale.objects.filter(sales_date__date=yesterday)
-    yesterday_sales_count = yesterday_sales.count()
-    yesterday_revenue = yesterday_sales.aggregate(total=Sum('total'))['total'] or 0
 
-    sales_change = ((today_sales_count - yesterday_sales_count) / yesterday_sales_count * 100
-                    if yesterday_sales_count else 0)
-    revenue_change = ((today_revenue - yesterday_revenue) / yesterday_revenue * 100
-                      if yesterday_revenue else 0)
+@admin_required
+def admin_dashboard(request):
+    filters = _admin_dashboard_filters(request)
+    results = run_queries(_admin_dashboard_parts(filters))
+    return render(request, 'accounts/admin_dashboard.html', _admin_dashboard_context(filters, results))
 
-    low_stock_products = Product.objects.low_stock().order_by('stock_quantity')
-    low_stock_count = low_stock_products.count()
-    out_of_stock = low_stock_products.filter(stock_quantity=0).count()
-    overdue_summary = get_overdue_summary()
 
-    pending_credits = Sale.objects.filter(
-        sales_type='credit'
-    ).exclude(
-        payment_status='paid'
-    ).count()
+@admin_required
+async def admin_dashboard_async(request):
+    filters = _admin_dashboard_filters(request)
+    results = await gather_queries(_admin_dashboard_parts(filters))
+    context = _admin_dashboard_context(filters, results)
+    return await sync_to_async(render)(request, 'accounts/admin_dashboard.html', context)
 
-    recent_sales = Sale.objects.select_related('product_sold').order_by('-sales_date')[:5]
-    recent_stocks = StockTransaction.objects.select_related('product').order_by('-date')[:5]
 
+def _staff_dashboard_parts(today):
+    yesterday = today - timedelta(days=1)
     today_start = timezone.make_aware(datetime.combine(today, time.min))
     today_end = timezone.make_aware(datetime.combine(today, time.max))
+    # low_stock() reads InventorySettings, so it is only built inside the parts.
+    def low_stock_products():
+        return Product.objects.low_stock().order_by('stock_quantity')
+
+    return {
+        'today': lambda: Sale.objects.filter(sales_date__date=today).aggregate(
+            count=Count('sale_id'), revenue=Sum('total')
+        ),
+        'yesterday': lambda: Sale.objects.filter(sales_date__date=yesterday).aggregate(
+            count=Count('sale_id'), revenue=Sum('total')
+        ),
+        'low_stock_products': lambda: list(low_stock_products().select_related('category')),
+        'out_of_stock': lambda: low_stock_products().filter(stock_quantity=0).count(),
+        'badges': get_badge_counts,
+        'credit_summary': credit_summary,
+        'recent_sales': lambda: list(Sale.objects.select_related('product_sold').order_by('-sales_date')[:5]),
+        'recent_stocks': lambda: list(StockTransaction.objects.select_related('product').order_by('-date')[:5]),
+        'hourly_sales': lambda: list(
+            Sale.objects
+            .filter(sales_date__range=(today_start, today_end))
+            .annotate(hour=TruncHour('sales_date'))
+            .values('hour')
+            .annotate(sales_count=Count('sale_id'), revenue=Sum('total'))
+            .order_by('hour')
+        ),
+    }
 
-    hourly_sales = (
-        Sale.objects
-        .filter(sales_date__range=(today_start, today_end))
-        .annotate(hour=TruncHour('sales_date'))
-        .values('hour')
-        .annotate(
-            sales_count=Count('sale_id'),
-            revenue=Sum('total')
-        )
-        .order_by('hour')
-    )
 
-    # Prepare chart data
-    chart_dates = [h['hour'].strftime('%H:00') for h in hourly_sales]
-    sales_data = [h['sales_count'] for h in hourly_sales]
-    revenue_data = [float(h['revenue'] or 0) for h in hourly_sales]
+def _staff_dashboard_context(results):
+    today_sales_count = results['today']['count']
+    today_revenue = results['today']['revenue'] or 0
+    hourly_sales = results['hourly_sales']
 
-    context = {
+    return {
         'today_sales_count': today_sales_count,
         'today_revenue': today_revenue,
-        'sales_change': sales_change,
-        'revenue_change': revenue_change,
-        'low_stock_count': low_stock_count,
-        'out_of_stock': out_of_stock,
-        'low_stock_products': low_stock_products,
-        'pending_credits': pending_credits,
-        'recent_sales': recent_sales,
-        'recent_stocks': recent_stocks,
-        'chart_dates': chart_dates,
-        'sales_data': sales_data,
-        'revenue_data': revenue_data,
-        'overdue_summary': overdue_summary
+        'sales_change': _percent_change(today_sales_count, results['yesterday']['count']),
+        'revenue_change': _percent_change(today_revenue, results['yesterday']['revenue'] or 0),
+        'low_stock_count': results['badges']['low_stock'],
+        'out_of_stock': results['out_of_stock'],
+        'low_stock_products': results['low_stock_products'],
+        'pending_credits': results['credit_summary']['pending_count'],
+        'credit_summary': results['credit_summary'],
+        'recent_sales': results['recent_sales'],
+        'recent_stocks': results['recent_stocks'],
+        'chart_dates': [h['hour'].strftime('%H:00') for h in hourly_sales],
+        'sales_data': [h['sales_count'] for h in hourly_sales],
+        'revenue_data': [float(h['revenue'] or 0) for h in hourly_sales],
     }
 
-    return render(request, 'accounts/staff_dashboard.html', context)
+
+@login_required
+def staff_dashboard(request):
+    results = run_queries(_staff_dashboard_parts(timezone.localtime().date()))
+    return render(request, 'accounts/staff_dashboard.html', _staff_dashboard_context(results))
+
+
+@login_required
+async def staff_dashboard_async(request):
+    results = await gather_queries(_staff_dashboard_parts(timezone.localtime().date()))
+    context = _staff_dashboard_context(results)
+    return await sync_to_async(render)(request, 'accounts/staff_dashboard.html', context)
 
 
 def custom_login(request):
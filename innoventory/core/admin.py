@@ -0,0 +1,58 @@
+from django.contrib import admin
+from .models import CacheNamespaceVersion, IdempotencyKey, QueryFingerprint, SlowQuery
+
+
+@admin.register(QueryFingerprint)
+class QueryFingerprintAdmin(admin.ModelAdmin):
+    list_display = ['short_sql', 'calls', 'mean_ms', 'max_duration_ms', 'total_duration_ms', 'last_seen']
+    search_fields = ['normalized_sql', 'fingerprint']
+    ordering = ['-total_duration_ms']
+    readonly_fields = [f.name for f in QueryFingerprint._meta.fields]
+
+    @admin.display(description='SQL')
+    def short_sql(self, obj):
+        return obj.normalized_sql[:120]
+
+    @admin.display(description='Mean (ms)', ordering='total_duration_ms')
+    def mean_ms(self, obj):
+        return round(obj.mean_duration_ms, 2)
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'view_name', 'duration_ms', 'short_sql']
+    list_filter = ['view_name', 'created_at']
+    search_fields = ['sql', 'fingerprint']
+    ordering = ['-created_at']
+    readonly_fields = [f.name for f in SlowQuery._meta.fields]
+
+    @admin.display(description='SQL')
+    def short_sql(self, obj):
+        return obj.sql[:120]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'user', 'view_name', 'status_code', 'key']
+    list_filter = ['view_name', 'status_code']
+    search_fields = ['key']
+    ordering = ['-created_at']
+    readonly_fields = [f.name for f in IdempotencyKey._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(CacheNamespaceVersion)
+class CacheNamespaceVersionAdmin(admin.ModelAdmin):
+    list_display = ['namespace', 'version', 'updated_at']
+    readonly_fields = [f.name for f in CacheNamespaceVersion._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
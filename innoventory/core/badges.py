@@ -0,0 +1,33 @@
+"""
+Header badge counts (overdue credits, low-stock products).
+
+The counts live in the credits/products/settings cache namespaces for a few
+seconds, so every page can show them without running the full list queries;
+any write to those namespaces recomputes them on the next read.
+"""
+from django.conf import settings
+from django.utils import timezone
+
+from . import cache as app_cache
+
+NAMESPACES = ('credits', 'products', 'settings')
+
+
+def _compute():
+    from products.models import Product
+    from sales.models import Sale
+
+    return {
+        'overdue_credits': Sale.objects.filter(
+            sales_type='credit', due_date__lt=timezone.localdate(), balance__gt=0
+        ).count(),
+        'low_stock': Product.objects.low_stock().count(),
+    }
+
+
+def get_badge_counts():
+    # The date is part of the key: credits turn overdue at midnight without a write.
+    return app_cache.get_or_set(
+        NAMESPACES, f'badge-counts:{timezone.localdate().isoformat()}',
+        _compute, getattr(settings, 'BADGE_COUNTS_TTL', 30),
+    )
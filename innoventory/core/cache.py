@@ -0,0 +1,182 @@
+"""
+Namespaced application cache.
+
+Cached values live under a namespace (products, sales, credits, reports,
+settings, users, fragments, catalog, categories). Every namespace has a version number stored in
+the cache itself, and keys embed the current version of each namespace they
+depend on. Writes to a namespace's source models bump its version through
+model signals (see core.signals), which orphans every dependent entry at
+once; the orphans then age out under their TTL. Code that writes through
+queryset update()/bulk_*() sends no signals and must call bump() itself.
+Bumps take effect when the surrounding transaction commits.
+
+Lookups are counted per namespace and exported by the metrics endpoint as
+innoventory_cache_requests_total{namespace,result}.
+
+A local-memory cache is private to one worker, so bump() also increments the
+namespace's row in CacheNamespaceVersion. CacheSyncMiddleware calls sync()
+on each request; at most every CACHE_SYNC_INTERVAL seconds it reads that
+table and bumps, locally, every namespace another worker has changed since.
+A worker therefore serves a stale entry for at most one interval.
+"""
+import threading
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from . import metrics
+
+NAMESPACES = (
+    'products', 'sales', 'credits', 'reports', 'settings', 'users', 'fragments', 'catalog', 'categories',
+)
+
+_MISSING = object()
+
+
+def _namespaces(namespaces):
+    if isinstance(namespaces, str):
+        namespaces = (namespaces,)
+    unknown = [ns for ns in namespaces if ns not in NAMESPACES]
+    if unknown:
+        raise ValueError(f"Unknown cache namespace(s): {', '.join(unknown)}")
+    return tuple(namespaces)
+
+
+def _version_key(namespace):
+    return f'ns:{namespace}:version'
+
+
+def versions(namespaces):
+    """Current version of each namespace, initialising missing ones."""
+    namespaces = _namespaces(namespaces)
+    keys = [_version_key(ns) for ns in namespaces]
+    found = cache.get_many(keys)
+    if len(found) < len(keys):
+        # Seeded from the clock so a version lost to eviction never reuses old keys.
+        for key in keys:
+            if key not in found:
+                cache.add(key, time.time_ns(), None)
+        found = cache.get_many(keys)
+    return [found.get(key, 0) for key in keys]
+
+
+def make_key(namespaces, key):
+    namespaces = _namespaces(namespaces)
+    stamp = '.'.join(str(v) for v in versions(namespaces))
+    return f"{'+'.join(namespaces)}:{stamp}:{key}"
+
+
+def _count(namespaces, hit):
+    metrics.inc('innoventory_cache_requests_total', namespace='+'.join(_namespaces(namespaces)),
+                result='hit' if hit else 'miss')
+
+
+def get_value(namespaces, key, default=None):
+    value = cache.get(make_key(namespaces, key), _MISSING)
+    _count(namespaces, value is not _MISSING)
+    return default if value is _MISSING else value
+
+
+def set_value(namespaces, key, value, timeout):
+    cache.set(make_key(namespaces, key), value, timeout)
+
+
+def get_or_set(namespaces, key, compute, timeout):
+    """Return the cached value, computing and storing it on a miss."""
+    full_key = make_key(namespaces, key)
+    value = cache.get(full_key, _MISSING)
+    _count(namespaces, value is not _MISSING)
+    if value is _MISSING:
+        value = compute()
+        cache.set(full_key, value, timeout)
+    return value
+
+
+def _bump_local(namespaces):
+    for namespace in namespaces:
+        try:
+            cache.incr(_version_key(namespace))
+        except ValueError:
+            cache.set(_version_key(namespace), time.time_ns(), None)
+
+
+def _publish(namespaces):
+    from .models import CacheNamespaceVersion
+
+    updated = CacheNamespaceVersion.objects.filter(namespace__in=namespaces).update(version=F('version') + 1)
+    if updated < len(namespaces):
+        CacheNamespaceVersion.objects.bulk_create(
+            [CacheNamespaceVersion(namespace=ns, version=1) for ns in namespaces],
+            ignore_conflicts=True,
+        )
+
+
+def _bump_now(namespaces):
+    _bump_local(namespaces)
+    if getattr(settings, 'CACHE_SYNC_INTERVAL', 0):
+        _publish(namespaces)
+
+
+def bump(*namespaces, using=None):
+    """
+    Bump the given namespaces once the current transaction commits, or
+    straight away under autocommit. Bumping earlier would let a concurrent
+    request re-cache the pre-commit rows under the new version, and would
+    hold the shared version rows locked until the caller commits.
+    """
+    namespaces = _namespaces(namespaces)
+    transaction.on_commit(partial(_bump_now, namespaces), using=using)
+
+
+def bump_receiver(*namespaces, ignored_fields=None):
+    """
+    Signal receiver bumping the given namespaces; connect it with weak=False.
+
+    ignored_fields maps a namespace to field names it does not depend on: a
+    save whose update_fields are all among them leaves that namespace alone.
+    """
+    namespaces = _namespaces(namespaces)
+    ignored_fields = {ns: frozenset(fields) for ns, fields in (ignored_fields or {}).items()}
+
+    def receiver(update_fields=None, **kwargs):
+        targets = [
+            ns for ns in namespaces
+            if not (update_fields and update_fields <= ignored_fields.get(ns, frozenset()))
+        ]
+        if targets:
+            bump(*targets, using=kwargs.get('using'))
+    return receiver
+
+
+_sync_lock = threading.Lock()
+_seen = None
+_last_sync = 0.0
+
+
+def sync(force=False):
+    """Pick up namespace bumps published by other workers, at most once per interval."""
+    global _seen, _last_sync
+    from .models import CacheNamespaceVersion
+
+    interval = getattr(settings, 'CACHE_SYNC_INTERVAL', 0)
+    if not interval or (not force and time.monotonic() - _last_sync < interval):
+        return []
+    if not _sync_lock.acquire(blocking=False):
+        return []  # another thread of this worker is already polling
+    try:
+        current = dict(CacheNamespaceVersion.objects.values_list('namespace', 'version'))
+        # The first poll only records a baseline: a new worker's cache holds nothing stale.
+        changed = [] if _seen is None else [
+            ns for ns, version in current.items() if ns in NAMESPACES and version != _seen.get(ns)
+        ]
+        _seen = current
+        _last_sync = time.monotonic()
+        if changed:
+            _bump_local(changed)
+        return changed
+    finally:
+        _sync_lock.release()
@@ -0,0 +1,56 @@
+"""
+Conditional GET for list and report pages.
+
+Each page supplies a cheap validator (typically one aggregate query such as
+the max modification time and row count of what it lists). The ETag also
+covers the viewer (user, role, CSRF secret), the query string, HTMX-ness and
+the template fragment version, so a 304 is only sent when the browser's copy
+would render identically. Pages with pending flash messages are never
+answered with 304, or the messages would be lost.
+"""
+import hashlib
+from functools import wraps
+
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from .fragments import fragment_version
+
+
+def _etag(validator):
+    def etag(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not request.user.is_authenticated:
+            return None
+        storage = getattr(request, '_messages', None)
+        if storage is not None and len(storage):
+            return None
+        parts = [
+            request.resolver_match.view_name if request.resolver_match else request.path,
+            request.user.pk,
+            request.user.username,
+            getattr(request.user, 'role', ''),
+            request.META.get('CSRF_COOKIE', ''),
+            request.headers.get('HX-Request', ''),
+            sorted(request.GET.lists()),
+            str(fragment_version()),
+            validator(request, *args, **kwargs),
+        ]
+        return hashlib.md5(repr(parts).encode()).hexdigest()
+    return etag
+
+
+def conditional_page(validator):
+    """Answer unchanged GETs with 304 before the view runs any of its queries."""
+    def decorator(view):
+        conditional_view = condition(etag_func=_etag(validator))(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                # Always revalidate; an unchanged page costs one validator query and a 304.
+                patch_cache_control(response, private=True, no_cache=True)
+                patch_vary_headers(response, ('Cookie', 'HX-Request'))
+            return response
+        return wrapper
+    return decorator
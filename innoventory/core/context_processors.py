@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .badges import get_badge_counts
+from .fragments import fragment_version
+
+
+def badge_counts(request):
+    # Lazy so pages that never render a badge don't touch the cache.
+    if not getattr(request, 'user', None) or not request.user.is_authenticated:
+        return {}
+    return {'badge_counts': SimpleLazyObject(get_badge_counts)}
+
+
+def fragment_cache(request):
+    return {
+        'fragment_cache_ttl': getattr(settings, 'FRAGMENT_CACHE_TTL', 600),
+        'fragment_version': SimpleLazyObject(fragment_version),
+    }
+
+
+def live_updates(request):
+    return {'live_updates_enabled': getattr(settings, 'LIVE_UPDATES_ENABLED', False)}
@@ -0,0 +1,148 @@
+"""
+In-process event broker for the dashboard Server-Sent Events stream.
+
+One polling task per event loop watches the database for new sales, stock
+movements and badge count changes, and fans each event out to the asyncio
+queues of every connected client. The database is polled once per interval
+no matter how many dashboards are open.
+
+Sales and stock movements are picked up by primary key, but ids are handed
+out at insert and only become visible at commit: a transaction can commit
+after a higher id has already been streamed. Ids skipped below the
+high-water mark are therefore kept as gaps and re-queried on every poll
+until they show up or GAP_TIMEOUT passes (a rolled-back insert never does),
+so each row is streamed once, in the order its commit became visible.
+"""
+import asyncio
+import logging
+import time
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Max, Q
+
+from .badges import get_badge_counts
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 100
+BATCH_LIMIT = 50
+GAP_TIMEOUT = 60
+
+
+def _initial_cursor():
+    from products.models import StockTransaction
+    from sales.models import Sale
+
+    return {
+        'sale': {'high': Sale.objects.aggregate(last=Max('sale_id'))['last'] or 0, 'gaps': {}},
+        'stock': {'high': StockTransaction.objects.aggregate(last=Max('id'))['last'] or 0, 'gaps': {}},
+        'badges': get_badge_counts(),
+    }
+
+
+def _new_rows(queryset, state, now):
+    """Rows committed since the last poll: past the high-water mark or filling a gap."""
+    gaps = state['gaps']
+    rows = list(queryset.filter(Q(pk__gt=state['high']) | Q(pk__in=list(gaps))).order_by('pk')[:BATCH_LIMIT])
+    found = {row.pk for row in rows}
+    for pk in found:
+        gaps.pop(pk, None)
+    high = max([state['high'], *found])
+    for pk in range(state['high'] + 1, high):
+        if pk not in found:
+            gaps[pk] = now
+    state['high'] = high
+    for pk, noticed in list(gaps.items()):
+        if now - noticed > GAP_TIMEOUT:
+            del gaps[pk]
+    return rows
+
+
+def _poll(cursor):
+    from products.models import StockTransaction
+    from sales.models import Sale
+
+    close_old_connections()
+    events = []
+    now = time.monotonic()
+
+    sales = _new_rows(Sale.objects.select_related('product_sold'), cursor['sale'], now)
+    for sale in sales:
+        events.append(('sale', {
+            'id': sale.sale_id,
+            'product': sale.item_label,
+            'quantity': sale.product_qty,
+            'total': sale.total,
+            'sales_type': sale.sales_type,
+        }))
+
+    stocks = _new_rows(StockTransaction.objects.select_related('product'), cursor['stock'], now)
+    for stock in stocks:
+        events.append(('stock', {
+            'id': stock.id,
+            'product': stock.product.name,
+            'transaction_type': stock.transaction_type,
+            'quantity': stock.quantity,
+            'from_sale': stock.remarks.startswith('SALE'),
+            'stock_quantity': stock.product.stock_quantity,
+        }))
+
+    badges = get_badge_counts()
+    if badges != cursor['badges']:
+        cursor['badges'] = badges
+        events.append(('badges', badges))
+
+    close_old_connections()
+    return events
+
+
+class Broker:
+    def __init__(self):
+        self.subscribers = set()
+        self.task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.subscribers.add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def publish(self, event):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A stalled client only loses its own events.
+                pass
+
+    async def _run(self):
+        interval = getattr(settings, 'EVENTS_POLL_INTERVAL', 2)
+        cursor = await sync_to_async(_initial_cursor, thread_sensitive=False)()
+        while self.subscribers:
+            await asyncio.sleep(interval)
+            try:
+                events = await sync_to_async(_poll, thread_sensitive=False)(cursor)
+            except Exception:
+                logger.exception("Error polling dashboard events")
+                continue
+            for event in events:
+                self.publish(event)
+
+
+_brokers = weakref.WeakKeyDictionary()
+
+
+def get_broker():
+    """The broker bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    broker = _brokers.get(loop)
+    if broker is None:
+        broker = _brokers[loop] = Broker()
+    return broker
@@ -0,0 +1,20 @@
+"""
+Version stamp for cached template fragments.
+
+Sidebar, header and product-row fragments put this version in their cache
+keys, and conditional GETs fold it into their ETags. Changes that alter
+their markup without touching a product's date_modified (inventory
+thresholds, category or supplier renames) bump the 'fragments' cache
+namespace (see core.signals), which orphans every fragment at once. Being
+a namespace, the bump reaches every worker through CacheNamespaceVersion.
+
+Product rows are keyed on date_modified, which queryset update() and
+bulk_update() leave alone (auto_now only fires in save()). Any such write
+that changes a rendered product field must set date_modified itself, as
+checkout_cart and the Excel import do, or bump 'fragments'.
+"""
+from . import cache as app_cache
+
+
+def fragment_version():
+    return app_cache.versions('fragments')[0]
@@ -0,0 +1,90 @@
+"""
+Idempotency keys for write endpoints.
+
+The client sends a fresh ``Idempotency-Key`` header (or ``idempotency_key``
+form field) per logical submission. The first request claims the key through
+a unique index and its response is stored on the row; retries and
+double-clicks with the same key get that stored response back without the
+view running again.
+"""
+import hashlib
+from functools import wraps
+
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+FIELD = 'idempotency_key'
+# Only these headers are replayed; everything else is rebuilt by the stack.
+REPLAYED_HEADERS = ('Content-Type', 'Location')
+
+
+def _request_hash(request):
+    items = sorted(
+        (key, value)
+        for key, values in request.POST.lists() if key not in (FIELD, 'csrfmiddlewaretoken')
+        for value in values
+    )
+    return hashlib.sha256(repr((request.path, items)).encode()).hexdigest()
+
+
+def _replay(record):
+    response = HttpResponse(bytes(record.response_body), status=record.status_code)
+    for name, value in record.response_headers.items():
+        response[name] = value
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view):
+    """Run a POST view at most once per (user, idempotency key)."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = (request.headers.get(HEADER) or request.POST.get(FIELD) or '').strip()
+        if request.method != 'POST' or not key or not request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+        if len(key) > 64:
+            return HttpResponse("Idempotency key too long.", status=400)
+
+        request_hash = _request_hash(request)
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    key=key, user=request.user, view_name=view.__name__, request_hash=request_hash
+                )
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(key=key, user=request.user).first()
+            if record is None:  # purged between the insert and the lookup
+                return HttpResponse("Please retry.", status=409, headers={'Retry-After': '1'})
+            if record.request_hash != request_hash or record.view_name != view.__name__:
+                return HttpResponse("Idempotency key reused for a different request.", status=422)
+            if record.status_code is None:
+                return HttpResponse("Request already in progress.", status=409, headers={'Retry-After': '1'})
+            return _replay(record)
+
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500 or response.streaming:
+            # Nothing worth replaying; free the key so the client can retry.
+            record.delete()
+            return response
+
+        headers = {name: response[name] for name in REPLAYED_HEADERS if name in response}
+        headers.update({name: value for name, value in response.items() if name.startswith('HX-')})
+        record.status_code = response.status_code
+        record.response_body = response.content
+        record.response_headers = headers
+        record.save(update_fields=['status_code', 'response_body', 'response_headers'])
+        return response
+    return wrapper
+
+
+def purge_idempotency_keys(older_than):
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=older_than).delete()
+    return deleted
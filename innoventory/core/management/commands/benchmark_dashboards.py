@@ -0,0 +1,77 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.perf import get_benchmark_user, summarize
+
+# (label, role, sequential url name, concurrent url name)
+DASHBOARDS = [
+    ('admin_dashboard', 'admin', 'admin_dashboard', 'admin_dashboard_async'),
+    ('staff_dashboard', 'staff', 'staff_dashboard', 'staff_dashboard_async'),
+]
+
+
+class Command(BaseCommand):
+    help = "Compare sequential and concurrent (async) dashboard latency on the current database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=10)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--output', help="Write results as JSON.")
+
+    def handle(self, *args, **opts):
+        results = {}
+        setup = self._connection_setup(opts['iterations'])
+        self.stdout.write(
+            f"connection setup   p50 {setup['p50_ms']:>8.1f}ms p95 {setup['p95_ms']:>8.1f}ms "
+            f"(concurrent views use up to {settings.DASHBOARD_QUERY_CONCURRENCY} pooled connections per process)"
+        )
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for label, role, sync_name, async_name in DASHBOARDS:
+                client = Client()
+                client.force_login(get_benchmark_user(role))
+                sequential = self._run(client, reverse(sync_name), opts['iterations'], opts['warmup'])
+                concurrent = self._run(client, reverse(async_name), opts['iterations'], opts['warmup'])
+                results[label] = {'sequential': sequential, 'concurrent': concurrent}
+                speedup = sequential['p50_ms'] / concurrent['p50_ms'] if concurrent['p50_ms'] else 0
+                self.stdout.write(
+                    f"{label:<18} sequential p50 {sequential['p50_ms']:>8.1f}ms p95 {sequential['p95_ms']:>8.1f}ms | "
+                    f"concurrent p50 {concurrent['p50_ms']:>8.1f}ms p95 {concurrent['p95_ms']:>8.1f}ms | "
+                    f"{speedup:.2f}x"
+                )
+
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                "SQLite gains little from parallel reads; run against PostgreSQL/MySQL for representative numbers."
+            ))
+        if opts['output']:
+            with open(opts['output'], 'w') as fh:
+                json.dump({'vendor': connection.vendor, 'connection_setup': setup, 'dashboards': results}, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {opts['output']}"))
+
+    def _run(self, client, url, iterations, warmup):
+        for _ in range(warmup):
+            client.get(url)
+        durations = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            response = client.get(url)
+            durations.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                self.stdout.write(self.style.WARNING(f"{url} returned {response.status_code}"))
+        return summarize(durations)
+
+    def _connection_setup(self, iterations):
+        """Time opening a fresh database connection (TCP/SSL handshake and auth included)."""
+        durations = []
+        for _ in range(iterations):
+            connection.close()
+            start = time.perf_counter()
+            connection.ensure_connection()
+            durations.append((time.perf_counter() - start) * 1000)
+        return summarize(durations)
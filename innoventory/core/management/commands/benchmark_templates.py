@@ -0,0 +1,80 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.template import engines
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.perf import get_benchmark_user, summarize
+
+# (label, role, url name)
+PAGES = [
+    ('product_list', 'admin', 'product_list'),
+    ('product_list_staff', 'staff', 'product_list'),
+    ('supplier_list', 'admin', 'supplier_list'),
+    ('sales_record', 'staff', 'sales_record'),
+    ('stock_transactions', 'admin', 'stock_transactions'),
+]
+
+
+class Command(BaseCommand):
+    help = ("Compare page render time with template fragment caching off and warm. "
+            "Run once with TEMPLATE_CACHED_LOADER=False to see the loader's share.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--output', help="Write results as JSON.")
+
+    def handle(self, *args, **opts):
+        loaders = engines['django'].engine.loaders
+        cached_loader = any(
+            (loader[0] if isinstance(loader, (list, tuple)) else loader).endswith('cached.Loader')
+            for loader in loaders
+        )
+        self.stdout.write(f"Template loader: {'cached' if cached_loader else 'uncached'}")
+
+        results = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for label, role, url_name in PAGES:
+                client = Client()
+                client.force_login(get_benchmark_user(role))
+                url = reverse(url_name)
+                cache.clear()
+                with override_settings(FRAGMENT_CACHE_TTL=0):
+                    uncached = self._run(client, url, opts['iterations'], opts['warmup'])
+                cache.clear()
+                cached = self._run(client, url, opts['iterations'], opts['warmup'])
+                results[label] = {'fragments_off': uncached, 'fragments_on': cached}
+                speedup = uncached['p50_ms'] / cached['p50_ms'] if cached['p50_ms'] else 0
+                self.stdout.write(
+                    f"{label:<20} off p50 {uncached['p50_ms']:>8.1f}ms {uncached['queries']:>4}q | "
+                    f"on p50 {cached['p50_ms']:>8.1f}ms {cached['queries']:>4}q | {speedup:.2f}x"
+                )
+
+        if opts['output']:
+            with open(opts['output'], 'w') as fh:
+                json.dump({'cached_loader': cached_loader, 'pages': results}, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {opts['output']}"))
+
+    def _run(self, client, url, iterations, warmup):
+        for _ in range(warmup):
+            client.get(url)
+        durations = []
+        queries = 0
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.get(url)
+                durations.append((time.perf_counter() - start) * 1000)
+            queries = max(queries, len(captured))
+            if response.status_code != 200:
+                self.stdout.write(self.style.WARNING(f"{url} returned {response.status_code}"))
+        result = summarize(durations)
+        result['queries'] = queries
+        return result
@@ -0,0 +1,153 @@
+import io
+import json
+import time
+from datetime import datetime
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from openpyxl import Workbook
+
+from core.perf import get_benchmark_user, summarize
+from products.models import Product, StockTransaction
+from sales.models import Sale
+from suppliers.models import Supplier
+
+# (label, url name, query params)
+GET_VIEWS = [
+    ('product_list', 'product_list', {}),
+    ('product_list_search', 'product_list', {'search': 'rice'}),
+    ('supplier_list', 'supplier_list', {}),
+    ('stock_transactions', 'stock_transactions', {}),
+    ('sales_record', 'sales_record', {}),
+    ('admin_dashboard', 'admin_dashboard', {}),
+    ('staff_dashboard', 'staff_dashboard', {}),
+    ('report_dashboard', 'reports:dashboard', {}),
+    ('credit_management', 'credit_management', {}),
+    ('credit_management_overdue', 'credit_management', {'status': 'overdue'}),
+    ('overdue_credits_modal', 'overdue_credits_modal', {}),
+    ('low_stock_modal', 'low_stock_modal', {}),
+    ('record_sale_modal', 'record_sale_modal', {}),
+    ('export_sales_report', 'reports:export_excel', {}),
+    ('export_low_stock', 'export_low_stock', {}),
+]
+
+
+class Command(BaseCommand):
+    help = "Time every main view through the Django test client and write JSON results."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument('--only', nargs='*', help="Limit to these view labels.")
+        parser.add_argument('--import-rows', type=int, default=500,
+                            help="Rows in the generated product import workbook (0 to skip imports).")
+        parser.add_argument('--output', help="Result file (default: benchmark-<vendor>-<timestamp>.json).")
+        parser.add_argument('--compare', help="Earlier result file to print a side-by-side comparison against.")
+
+    def handle(self, *args, **opts):
+        client = Client()
+        client.force_login(get_benchmark_user('admin'))
+
+        views = [v for v in GET_VIEWS if not opts['only'] or v[0] in opts['only']]
+        results = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for label, url_name, params in views:
+                results[label] = self._run(
+                    lambda: client.get(reverse(url_name), params),
+                    opts['iterations'], opts['warmup'],
+                )
+                self._report(label, results[label])
+
+            if opts['import_rows'] and (not opts['only'] or 'import_products' in opts['only']):
+                workbook = self._import_workbook(opts['import_rows'])
+                url = reverse('upload_excel_modal')
+
+                def upload():
+                    workbook.seek(0)
+                    workbook.name = 'benchmark.xlsx'
+                    return client.post(url, {'type': 'product', 'excel_file': workbook})
+
+                results['import_products'] = self._run(upload, opts['iterations'], opts['warmup'])
+                self._report('import_products', results['import_products'])
+
+        payload = {
+            'meta': {
+                'vendor': connection.vendor,
+                'database': str(connection.settings_dict.get('NAME')),
+                'django': django.get_version(),
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'iterations': opts['iterations'],
+                'rows': {
+                    'products': Product.objects.count(),
+                    'suppliers': Supplier.objects.count(),
+                    'sales': Sale.objects.count(),
+                    'stock_transactions': StockTransaction.objects.count(),
+                },
+            },
+            'views': results,
+        }
+        output = opts['output'] or f"benchmark-{connection.vendor}-{datetime.now():%Y%m%d-%H%M%S}.json"
+        with open(output, 'w') as fh:
+            json.dump(payload, fh, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+        if opts['compare']:
+            self._compare(opts['compare'], payload)
+
+    def _run(self, request, iterations, warmup):
+        for _ in range(warmup):
+            request()
+
+        durations = []
+        queries = []
+        sizes = []
+        status = None
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = request()
+                durations.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured))
+            sizes.append(len(response.content) if not response.streaming else 0)
+            status = response.status_code
+
+        result = summarize(durations)
+        result.update({'status': status, 'queries': max(queries), 'bytes': max(sizes)})
+        return result
+
+    def _report(self, label, result):
+        self.stdout.write(
+            f"{label:<28} {result['p50_ms']:>10.1f} ms p50 {result['p95_ms']:>10.1f} ms p95 "
+            f"{result['queries']:>5} queries  [{result['status']}]"
+        )
+
+    def _import_workbook(self, rows):
+        wb = Workbook()
+        ws = wb.active
+        ws.append(['name', 'price', 'stock_quantity', 'category', 'supplier'])
+        for i in range(rows):
+            ws.append([f'benchmark-import-{i}', 10 + i % 90, 1, 'Benchmark Category', 'Benchmark Supplier'])
+        buffer = io.BytesIO()
+        wb.save(buffer)
+        return buffer
+
+    def _compare(self, path, current):
+        try:
+            with open(path) as fh:
+                previous = json.load(fh)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+
+        before, after = previous['meta']['vendor'], current['meta']['vendor']
+        self.stdout.write(f"\n{'view':<28} {before + ' p95':>14} {after + ' p95':>14} {'ratio':>8}")
+        for label, result in current['views'].items():
+            old = previous['views'].get(label)
+            if not old or not old.get('p95_ms'):
+                continue
+            ratio = result['p95_ms'] / old['p95_ms']
+            self.stdout.write(f"{label:<28} {old['p95_ms']:>14.1f} {result['p95_ms']:>14.1f} {ratio:>7.2f}x")
@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.idempotency import purge_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = "Delete stored idempotency keys older than IDEMPOTENCY_KEY_TTL_HOURS. Run daily (e.g. from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=None,
+                            help="Override IDEMPOTENCY_KEY_TTL_HOURS.")
+
+    def handle(self, *args, **opts):
+        hours = opts['hours'] if opts['hours'] is not None else getattr(settings, 'IDEMPOTENCY_KEY_TTL_HOURS', 24)
+        deleted = purge_idempotency_keys(timezone.now() - timedelta(hours=hours))
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} idempotency key(s)."))
@@ -0,0 +1,156 @@
+import glob
+import json
+import queue
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+
+from core.perf import get_benchmark_user, summarize
+from core.recording import recording_dir
+
+
+def load_recordings(paths):
+    files = []
+    for path in paths or [str(recording_dir())]:
+        if Path(path).is_dir():
+            files.extend(glob.glob(str(Path(path) / 'requests-*.jsonl*')))
+        else:
+            files.extend(glob.glob(path))
+    entries = []
+    for name in files:
+        with open(name) as fh:
+            for line in fh:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    entries.sort(key=lambda e: e['ts'])
+    return entries
+
+
+class Command(BaseCommand):
+    help = "Re-issue recorded requests against the local database and report per-view latency percentiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help="Recording files or directories (default: REQUEST_RECORDING_DIR).")
+        parser.add_argument('--speed', type=float, default=1.0,
+                            help="Replay speed multiplier; 2 replays twice as fast, 0 ignores recorded gaps.")
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--limit', type=int, help="Replay only the first N requests.")
+        parser.add_argument('--read-only', action='store_true', help="Skip everything except GET requests.")
+        parser.add_argument('--output', help="Write the per-view summary as JSON.")
+
+    def handle(self, *args, **opts):
+        entries = load_recordings(opts['paths'])
+        if opts['read_only']:
+            entries = [e for e in entries if e['method'] == 'GET']
+        if opts['limit']:
+            entries = entries[:opts['limit']]
+        if not entries:
+            raise CommandError("No recorded requests found.")
+
+        users = {role: get_benchmark_user(role) for role in ('admin', 'staff')}
+        local = threading.local()
+        lock = threading.Lock()
+        latencies = defaultdict(list)
+        statuses = defaultdict(Counter)
+        skipped = Counter()
+        lag = []
+
+        def client_for(role):
+            clients = getattr(local, 'clients', None)
+            if clients is None:
+                clients = local.clients = {}
+            if role not in clients:
+                client = Client()
+                if role in users:
+                    client.force_login(users[role])
+                clients[role] = client
+            return clients[role]
+
+        def replay(entry, due):
+            client = client_for(entry['role'])
+            headers = {'HTTP_HX_REQUEST': 'true'} if entry.get('htmx') else {}
+            start = time.perf_counter()
+            try:
+                if entry['method'] == 'GET':
+                    response = client.get(entry['path'], entry['query'], **headers)
+                elif entry['method'] == 'POST':
+                    response = client.post(entry['path'], entry['form'], **headers)
+                else:
+                    response = client.generic(entry['method'], entry['path'], **headers)
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    latencies[entry['view']].append(elapsed)
+                    statuses[entry['view']][response.status_code] += 1
+                    lag.append(max(0.0, (start - due) * 1000))
+            except Exception as e:
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    latencies[entry['view']].append(elapsed)
+                    statuses[entry['view']][type(e).__name__] += 1
+
+        def worker(jobs):
+            # Each thread keeps its database connection for the whole run, like a
+            # long-lived app worker; a reconnect per request would skew latencies.
+            try:
+                while True:
+                    job = jobs.get()
+                    if job is None:
+                        return
+                    replay(*job)
+            finally:
+                connection.close()
+
+        speed = opts['speed']
+        first_ts = entries[0]['ts']
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            jobs = queue.Queue()
+            threads = [threading.Thread(target=worker, args=(jobs,)) for _ in range(opts['concurrency'])]
+            for thread in threads:
+                thread.start()
+            started = time.perf_counter()
+            for entry in entries:
+                if entry.get('files'):
+                    skipped['file upload'] += 1
+                    continue
+                due = started + ((entry['ts'] - first_ts) / speed if speed > 0 else 0)
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                jobs.put((entry, due))
+            for _ in threads:
+                jobs.put(None)
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+        total = sum(len(v) for v in latencies.values())
+        self.stdout.write(f"Replayed {total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s) at speed x{speed:g}")
+        if lag:
+            self.stdout.write(f"Schedule lag: {summarize(lag)['p95_ms']:.1f}ms p95")
+        for reason, n in skipped.items():
+            self.stdout.write(self.style.WARNING(f"Skipped {n} request(s): {reason}"))
+
+        summary = {}
+        self.stdout.write(f"\n{'view':<32} {'n':>6} {'p50':>9} {'p95':>9} {'p99':>9}  statuses")
+        for view in sorted(latencies, key=lambda v: -len(latencies[v])):
+            stats = summarize(latencies[view])
+            stats['statuses'] = {str(k): n for k, n in statuses[view].items()}
+            summary[view] = stats
+            codes = ', '.join(f"{k}: {n}" for k, n in stats['statuses'].items())
+            self.stdout.write(
+                f"{view:<32} {stats['count']:>6} {stats['p50_ms']:>8.1f}ms {stats['p95_ms']:>8.1f}ms "
+                f"{stats['p99_ms']:>8.1f}ms  {codes}"
+            )
+
+        if opts['output']:
+            with open(opts['output'], 'w') as fh:
+                json.dump({'speed': speed, 'requests': total, 'views': summary}, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Summary written to {opts['output']}"))
@@ -0,0 +1,342 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Max, OuterRef, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core import cache as app_cache
+from products.models import Category, Product, StockTransaction
+from sales.models import Customer, Sale, SaleLine
+from suppliers.models import Supplier
+
+ADJECTIVES = [
+    'Classic', 'Premium', 'Eco', 'Mini', 'Jumbo', 'Fresh', 'Smart', 'Deluxe',
+    'Basic', 'Ultra', 'Family', 'Travel', 'Organic', 'Heavy-duty', 'Compact',
+]
+NOUNS = [
+    'Rice', 'Soap', 'Shampoo', 'Noodles', 'Coffee', 'Sardines', 'Cooking Oil',
+    'Detergent', 'Biscuits', 'Battery', 'Notebook', 'Toothpaste', 'Vinegar',
+    'Soy Sauce', 'Candles', 'Light Bulb', 'Canned Corn', 'Bottled Water',
+]
+FIRST_NAMES = ['Ana', 'Ben', 'Carla', 'Dan', 'Ella', 'Francis', 'Grace', 'Hector', 'Ivy', 'Jose', 'Kim', 'Leo']
+LAST_NAMES = ['Santos', 'Reyes', 'Cruz', 'Bautista', 'Garcia', 'Mendoza', 'Torres', 'Flores', 'Ramos', 'Aquino']
+
+
+@contextmanager
+def _without_auto_now(model, field_name):
+    """Let bulk_create keep explicit values for an auto_now field."""
+    field = model._meta.get_field(field_name)
+    original = field.auto_now
+    field.auto_now = False
+    try:
+        yield
+    finally:
+        field.auto_now = original
+
+
+class Command(BaseCommand):
+    help = "Bulk-generate a production-scale data set for local benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100_000)
+        parser.add_argument('--suppliers', type=int, default=5_000)
+        parser.add_argument('--categories', type=int, default=60)
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--sales', type=int, default=2_000_000)
+        parser.add_argument('--transactions', type=int, default=3_000_000,
+                            help="Total stock transactions, including the OUT entry of every sale.")
+        parser.add_argument('--credit-ratio', type=float, default=0.2)
+        parser.add_argument('--days', type=int, default=365, help="Spread sales over this many past days.")
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='seed', help="Prefix for generated names, keeps reruns distinct.")
+
+    def handle(self, *args, **opts):
+        if opts['transactions'] < opts['sales'] + opts['products']:
+            raise CommandError("--transactions must cover one OUT per sale plus at least one IN per product.")
+
+        self.rng = random.Random(opts['seed'])
+        self.batch_size = opts['batch_size']
+        self.prefix = opts['prefix']
+        started = time.perf_counter()
+
+        users = self._users(opts['users'])
+        categories = self._categories(opts['categories'])
+        suppliers = self._suppliers(opts['suppliers'])
+        products = self._products(opts['products'], categories, suppliers)
+        out_totals = self._sales(opts['sales'], products, users, opts['credit_ratio'], opts['days'])
+        self._restocks(opts['transactions'] - opts['sales'], products, out_totals, opts['days'])
+        self._sync_stock(products)
+        app_cache.bump(*app_cache.NAMESPACES)  # bulk_create and update() skip the model signals
+
+        self.stdout.write(self.style.SUCCESS(f"Seeded data in {time.perf_counter() - started:.1f}s"))
+
+    def _log(self, label, count, started):
+        self.stdout.write(f"  {label}: {count:,} rows in {time.perf_counter() - started:.1f}s")
+
+    def _pks_by(self, model, field, values):
+        """Primary keys of just-created rows by natural key; bulk_create returns none on MySQL."""
+        found = {}
+        for offset in range(0, len(values), self.batch_size):
+            chunk = values[offset:offset + self.batch_size]
+            found.update(model.objects.filter(**{f'{field}__in': chunk}).values_list(field, 'pk'))
+        return [found[value] for value in values]
+
+    def _users(self, count):
+        started = time.perf_counter()
+        User = get_user_model()
+        password = make_password('benchmark')
+        User.objects.bulk_create([
+            User(
+                username=f'{self.prefix}_staff_{i}',
+                email=f'{self.prefix}_staff_{i}@innoventory.local',
+                phone_number=f'{self.prefix[:4]}-{i}',
+                role='staff',
+                password=password,
+            )
+            for i in range(count)
+        ], ignore_conflicts=True)
+        users = list(User.objects.filter(username__startswith=f'{self.prefix}_staff_').values_list('id', flat=True))
+        self._log('users', len(users), started)
+        return users
+
+    def _categories(self, count):
+        started = time.perf_counter()
+        Category.objects.bulk_create(
+            [Category(name=f'{self.prefix} {NOUNS[i % len(NOUNS)]} {i}') for i in range(count)],
+            ignore_conflicts=True,
+        )
+        categories = list(Category.objects.filter(name__startswith=f'{self.prefix} ').values_list('id', flat=True))
+        self._log('categories', len(categories), started)
+        return categories
+
+    def _suppliers(self, count):
+        started = time.perf_counter()
+        objs = [
+            Supplier(
+                name=f'{self.prefix} Supplier {i}',
+                contact=f'09{self.rng.randrange(10**9):09d}',
+                email=f'supplier{i}@{self.prefix}.local',
+                address=f'{i} Market Street',
+            )
+            for i in range(count)
+        ]
+        Supplier.objects.bulk_create(objs, batch_size=self.batch_size)
+        ids = self._pks_by(Supplier, 'name', [s.name for s in objs])
+        self._log('suppliers', len(ids), started)
+        return ids
+
+    def _products(self, count, categories, suppliers):
+        started = time.perf_counter()
+        ids = []
+        prices = []
+        for offset in range(0, count, self.batch_size):
+            batch = []
+            for i in range(offset, min(count, offset + self.batch_size)):
+                tracked = self.rng.random() < 0.1
+                batch.append(Product(
+                    name=f'{self.rng.choice(ADJECTIVES)} {self.rng.choice(NOUNS)} {self.prefix}-{i}',
+                    category_id=self.rng.choice(categories),
+                    supplier_id=self.rng.choice(suppliers),
+                    price=round(self.rng.uniform(5, 2500), 2),
+                    stock_quantity=0,
+                    is_tracked=tracked,
+                    low_threshold=10 if tracked else None,
+                    medium_threshold=40 if tracked else None,
+                ))
+            with transaction.atomic():
+                Product.objects.bulk_create(batch)
+            ids.extend(self._pks_by(Product, 'name', [p.name for p in batch]))
+            prices.extend(p.price for p in batch)
+        self._log('products', len(ids), started)
+        return list(zip(ids, prices))
+
+    def _sales(self, count, products, users, credit_ratio, days):
+        started = time.perf_counter()
+        now = timezone.now()
+        today = timezone.localdate()
+        customers = [
+            Customer(
+                name=f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)} {self.prefix}-{n}',
+                contact=f'09{n:09d}',
+            )
+            for n in range(max(50, int(count * credit_ratio / 40)))
+        ]
+        for customer in customers:
+            customer.name_key = Customer.key_for(customer.name)
+        Customer.objects.bulk_create(customers, batch_size=self.batch_size, ignore_conflicts=True)
+        customers = list(
+            Customer.objects.filter(name_key__in=[c.name_key for c in customers]).values_list('pk', 'name', 'contact')
+        )
+        out_totals = [0] * len(products)
+
+        with _without_auto_now(Sale, 'sales_date'):
+            for offset in range(0, count, self.batch_size):
+                sales = []
+                picks = []
+                for _ in range(min(self.batch_size, count - offset)):
+                    index = self.rng.randrange(len(products))
+                    product_id, price = products[index]
+                    qty = self.rng.randint(1, 5)
+                    out_totals[index] += qty
+                    total = round(price * qty, 2)
+                    sold_at = now - timedelta(days=self.rng.randrange(days), seconds=self.rng.randrange(86400))
+                    sale = Sale(
+                        product_sold_id=product_id,
+                        product_qty=qty,
+                        total=total,
+                        sales_date=sold_at,
+                        sold_by_id=self.rng.choice(users) if users else None,
+                    )
+                    if self.rng.random() < credit_ratio:
+                        self._fill_credit(sale, total, sold_at, today, customers)
+                    else:
+                        sale.sales_type = 'cash'
+                        sale.payment_status = 'paid'
+                        sale.amount_paid = total
+                        sale.balance = 0
+                    sales.append(sale)
+                    picks.append((product_id, qty, sold_at.date()))
+
+                with transaction.atomic():
+                    last = Sale.objects.aggregate(last=Max('sale_id'))['last'] or 0
+                    Sale.objects.bulk_create(sales)
+                    self._fill_sale_ids(sales, last)
+                    SaleLine.objects.bulk_create([
+                        SaleLine(
+                            sale=sale,
+                            product_id=product_id,
+                            quantity=qty,
+                            unit_price=round(sale.total / qty, 2),
+                            line_total=sale.total,
+                        )
+                        for sale, (product_id, qty, _) in zip(sales, picks)
+                    ])
+                    StockTransaction.objects.bulk_create([
+                        StockTransaction(
+                            product_id=product_id,
+                            transaction_type='OUT',
+                            quantity=qty,
+                            date=sold_on,
+                            remarks=f"SALE - {sale.sales_type.upper()} - Sale ID: {sale.sale_id}",
+                        )
+                        for sale, (product_id, qty, sold_on) in zip(sales, picks)
+                    ])
+
+        ids = [pk for pk, _, _ in customers]
+        for offset in range(0, len(ids), self.batch_size):
+            Customer.refresh_balances(ids[offset:offset + self.batch_size])
+        self._log('sales (+ lines and OUT transactions)', count, started)
+        return out_totals
+
+    def _fill_sale_ids(self, sales, last):
+        """
+        Give the batch its ids when bulk_create could not return them (MySQL).
+
+        Sales have no natural key, but this command is their only writer while
+        it runs: the batch's rows are the ones after `last`, in insertion order.
+        """
+        if sales[0].pk is not None:
+            return
+        ids = list(Sale.objects.filter(sale_id__gt=last).order_by('sale_id').values_list('sale_id', flat=True))
+        if len(ids) != len(sales):
+            raise CommandError("Sales were written concurrently with seed_data; rerun it on an idle database.")
+        for sale, sale_id in zip(sales, ids):
+            sale.sale_id = sale_id
+
+    def _fill_credit(self, sale, total, sold_at, today, customers):
+        customer_id, name, contact = self.rng.choice(customers)
+        sale.sales_type = 'credit'
+        sale.customer_id = customer_id
+        sale.customer_name = name
+        sale.customer_contact = contact
+        sale.due_date = sold_at.date() + timedelta(days=self.rng.choice([7, 15, 30, 45, 60]))
+        roll = self.rng.random()
+        if roll < 0.45:
+            paid = total
+        elif roll < 0.7:
+            paid = round(total * self.rng.uniform(0.1, 0.9), 2)
+        else:
+            paid = 0
+        sale.amount_paid = paid
+        sale.balance = round(total - paid, 2)
+        if sale.balance <= 0:
+            sale.payment_status = 'paid'
+        elif sale.due_date < today:
+            sale.payment_status = 'overdue'
+        elif paid > 0:
+            sale.payment_status = 'partial'
+        else:
+            sale.payment_status = 'pending'
+
+    def _restocks(self, count, products, out_totals, days):
+        """Create IN entries so every product's ledger ends non-negative."""
+        started = time.perf_counter()
+        today = timezone.localdate()
+        # Every product gets one IN, the remainder is spread randomly.
+        per_product = [1] * len(products)
+        for _ in range(count - len(products)):
+            per_product[self.rng.randrange(len(products))] += 1
+
+        pending = []
+        written = 0
+        for index, (product_id, _) in enumerate(products):
+            needed = out_totals[index] + self.rng.randint(0, 200)
+            entries = per_product[index]
+            # Split `needed` into `entries` positive parts.
+            cuts = sorted(self.rng.sample(range(1, needed + entries), entries - 1)) if entries > 1 else []
+            bounds = [0] + cuts + [needed + entries]
+            for low, high in zip(bounds, bounds[1:]):
+                pending.append(StockTransaction(
+                    product_id=product_id,
+                    transaction_type='IN',
+                    quantity=high - low,
+                    date=today - timedelta(days=self.rng.randrange(days)),
+                    remarks='Restock delivery',
+                ))
+            if len(pending) >= self.batch_size:
+                with transaction.atomic():
+                    StockTransaction.objects.bulk_create(pending)
+                written += len(pending)
+                pending = []
+        if pending:
+            with transaction.atomic():
+                StockTransaction.objects.bulk_create(pending)
+            written += len(pending)
+        self._log('IN transactions', written, started)
+
+    def _sync_stock(self, products):
+        """Set stock_quantity from the ledger in a single UPDATE."""
+        started = time.perf_counter()
+        ledger = (
+            StockTransaction.objects
+            .filter(product=OuterRef('pk'))
+            .values('product')
+            .annotate(net=Sum(Case(
+                When(transaction_type='IN', then=F('quantity')),
+                default=F('quantity') * -1,
+                output_field=IntegerField(),
+            )))
+        )
+        received = (
+            StockTransaction.objects
+            .filter(product=OuterRef('pk'), transaction_type='IN')
+            .values('product')
+            .annotate(total=Sum('quantity'))
+            .values('total')
+        )
+        ids = [product_id for product_id, _ in products]
+        for offset in range(0, len(ids), self.batch_size):
+            chunk = ids[offset:offset + self.batch_size]
+            Product.objects.filter(pk__in=chunk).update(
+                stock_quantity=Coalesce(Subquery(ledger.values('net')), 0),
+                max_stock_recorded=Coalesce(Subquery(received), 0),
+            )
+        self._log('product stock synced from ledger', len(ids), started)
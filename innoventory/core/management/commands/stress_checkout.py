@@ -0,0 +1,189 @@
+import multiprocessing
+import random
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Case, F, IntegerField, Sum, When
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.perf import get_benchmark_user, summarize
+from products.models import Category, Product, StockTransaction
+from sales.models import Sale
+from suppliers.models import Supplier
+
+OPERATIONS = ('create_sale', 'stock_out', 'delete_credit_sale')
+
+
+def _pick_credit_sale(rng, product_ids):
+    recent = list(
+        Sale.objects.filter(sales_type='credit', product_sold_id__in=product_ids)
+        .order_by('-sale_id').values_list('sale_id', flat=True)[:20]
+    )
+    return rng.choice(recent) if recent else None
+
+
+def _worker(job):
+    """Run one worker's share of operations; returns (op, status, ms, error) tuples."""
+    index, user_id, product_ids, operations, weights, seed = job
+    rng = random.Random(seed + index)
+    client = Client()
+    client.force_login(get_user_model().objects.get(pk=user_id))
+    today = timezone.localdate().isoformat()
+    samples = []
+
+    try:
+        for _ in range(operations):
+            op = rng.choices(OPERATIONS, weights)[0]
+            product = rng.choice(product_ids)
+            start = time.perf_counter()
+            error = ''
+            try:
+                if op == 'create_sale':
+                    sales_type = rng.choice(['cash', 'credit'])
+                    response = client.post(reverse('create_sale'), {
+                        'product': product,
+                        'quantity': rng.randint(1, 3),
+                        'sales_type': sales_type,
+                        'customer_name': f'Stress Customer {index}' if sales_type == 'credit' else '',
+                        'due_date': today if sales_type == 'credit' else '',
+                    })
+                elif op == 'stock_out':
+                    response = client.post(reverse('stock_transactions'), {
+                        'product': product,
+                        'transaction_type': 'OUT',
+                        'quantity': rng.randint(1, 3),
+                        'remarks': 'stress test stock out',
+                        'date': today,
+                    })
+                else:
+                    sale_id = _pick_credit_sale(rng, product_ids)
+                    if sale_id is None:
+                        continue
+                    response = client.post(reverse('delete_credit_sale', args=[sale_id]))
+                status = response.status_code
+            except Exception as e:  # database locked, deadlocks, integrity errors...
+                status = 'error'
+                error = f"{type(e).__name__}: {e}"
+            samples.append((op, status, (time.perf_counter() - start) * 1000, error))
+    finally:
+        connection.close()
+    return samples
+
+
+class Command(BaseCommand):
+    help = ("Hammer create_sale, stock-out and delete_credit_sale concurrently, "
+            "then verify stock invariants on the stress products.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--mode', choices=['threads', 'processes'], default='threads')
+        parser.add_argument('--operations', type=int, default=200, help="Operations per worker.")
+        parser.add_argument('--products', type=int, default=3,
+                            help="Few products means more contention on the same rows.")
+        parser.add_argument('--initial-stock', type=int, default=500)
+        parser.add_argument('--mix', default='6,3,1',
+                            help="Weights for create_sale,stock_out,delete_credit_sale.")
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **opts):
+        weights = [float(w) for w in opts['mix'].split(',')]
+        if len(weights) != len(OPERATIONS):
+            raise CommandError("--mix needs one weight per operation: create_sale,stock_out,delete_credit_sale")
+
+        user = get_benchmark_user('staff')
+        product_ids = self._setup_products(opts['products'], opts['initial_stock'])
+        jobs = [
+            (i, user.pk, product_ids, opts['operations'], weights, opts['seed'])
+            for i in range(opts['workers'])
+        ]
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            started = time.perf_counter()
+            if opts['mode'] == 'processes':
+                connections.close_all()
+                with multiprocessing.get_context('fork').Pool(opts['workers']) as pool:
+                    results = pool.map(_worker, jobs)
+            else:
+                with ThreadPoolExecutor(max_workers=opts['workers']) as pool:
+                    results = list(pool.map(_worker, jobs))
+            elapsed = time.perf_counter() - started
+
+        samples = [s for worker in results for s in worker]
+        self._report(samples, elapsed)
+        violations = self._check_invariants(product_ids)
+        if violations:
+            for line in violations:
+                self.stdout.write(self.style.ERROR(line))
+            raise CommandError(f"{len(violations)} invariant violation(s) detected.")
+        self.stdout.write(self.style.SUCCESS("Invariants hold: no negative stock, ledger matches stock_quantity."))
+
+    def _setup_products(self, count, initial_stock):
+        supplier, _ = Supplier.objects.get_or_create(
+            name='Stress Test Supplier', defaults={'contact': 'n/a', 'email': 'stress@innoventory.local'}
+        )
+        category, _ = Category.objects.get_or_create(name='Stress Test')
+        ids = []
+        for i in range(count):
+            product = Product.objects.create(
+                name=f'stress-product-{int(time.time())}-{i}',
+                category=category,
+                supplier=supplier,
+                price=10,
+                stock_quantity=0,
+            )
+            # Opening balance goes through the ledger so IN - OUT == stock_quantity.
+            StockTransaction.objects.create(
+                product=product, transaction_type='IN', quantity=initial_stock, remarks='stress opening stock'
+            )
+            ids.append(product.pk)
+        return ids
+
+    def _report(self, samples, elapsed):
+        by_op = defaultdict(list)
+        statuses = defaultdict(Counter)
+        errors = Counter()
+        for op, status, ms, error in samples:
+            by_op[op].append(ms)
+            statuses[op][status] += 1
+            if error:
+                errors[error.splitlines()[0][:120]] += 1
+
+        self.stdout.write(f"{len(samples)} operations in {elapsed:.2f}s ({len(samples) / elapsed:.1f} ops/s)")
+        for op in OPERATIONS:
+            if not by_op[op]:
+                continue
+            stats = summarize(by_op[op])
+            codes = ', '.join(f"{code}: {n}" for code, n in sorted(statuses[op].items(), key=str))
+            self.stdout.write(
+                f"  {op:<20} n={stats['count']:<6} p50={stats['p50_ms']:.1f}ms "
+                f"p95={stats['p95_ms']:.1f}ms max={stats['max_ms']:.1f}ms  [{codes}]"
+            )
+        for error, n in errors.most_common(5):
+            self.stdout.write(self.style.WARNING(f"  {n} x {error}"))
+
+    def _check_invariants(self, product_ids):
+        ledger = dict(
+            StockTransaction.objects.filter(product_id__in=product_ids)
+            .values('product_id')
+            .annotate(net=Sum(Case(
+                When(transaction_type='IN', then=F('quantity')),
+                default=F('quantity') * -1,
+                output_field=IntegerField(),
+            )))
+            .values_list('product_id', 'net')
+        )
+        violations = []
+        for product in Product.objects.filter(pk__in=product_ids):
+            if product.stock_quantity < 0:
+                violations.append(f"{product.name}: negative stock ({product.stock_quantity})")
+            net = ledger.get(product.pk, 0)
+            if net != product.stock_quantity:
+                violations.append(f"{product.name}: ledger sum {net} != stock_quantity {product.stock_quantity}")
+        return violations
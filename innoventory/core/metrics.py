@@ -0,0 +1,281 @@
+"""
+Process-local metrics registry with a shared on-disk store.
+
+Every gunicorn worker keeps its own counters in memory and periodically dumps
+them to ``<METRICS_DIR>/metrics-<pid>.json``. The metrics endpoint merges all
+worker files, so the exported numbers cover every worker on the host.
+
+Files of workers that have exited are folded into ``metrics-archive.json``
+and deleted, when the endpoint collects and when a process first flushes
+(a new process reusing a dead worker's pid would otherwise overwrite its
+file). Counters therefore stay monotonic across worker restarts while the
+directory holds one file per live worker plus the archive.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: no concurrent workers to guard against
+    fcntl = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+HISTOGRAMS = {
+    'innoventory_request_duration_seconds': ('Request latency per URL name.', LATENCY_BUCKETS),
+    'innoventory_request_db_seconds': ('Time spent in database queries per request.', LATENCY_BUCKETS),
+    'innoventory_request_queries': ('Database queries executed per request.', QUERY_BUCKETS),
+    'innoventory_response_size_bytes': ('Response body size per URL name.', SIZE_BUCKETS),
+    'innoventory_job_duration_seconds': ('Duration of import/export jobs.', JOB_BUCKETS),
+}
+
+COUNTERS = {
+    'innoventory_job_rows_total': 'Rows processed by import/export jobs.',
+    'innoventory_job_runs_total': 'Import/export job runs by outcome.',
+    'innoventory_cache_requests_total': 'Application cache lookups by namespace and hit/miss.',
+}
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_last_flush = 0.0
+_compacted = False
+ARCHIVE = 'metrics-archive.json'
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def observe(name, value, **labels):
+    buckets = HISTOGRAMS[name][1]
+    with _lock:
+        entry = _histograms.get(_key(name, labels))
+        if entry is None:
+            entry = _histograms[_key(name, labels)] = [[0] * (len(buckets) + 1), 0.0, 0]
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                entry[0][i] += 1
+                break
+        else:
+            entry[0][-1] += 1
+        entry[1] += value
+        entry[2] += 1
+
+
+def inc(name, amount=1, **labels):
+    with _lock:
+        key = _key(name, labels)
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def record_job_rows(job, rows):
+    inc('innoventory_job_rows_total', rows, job=job)
+
+
+def track_job(job):
+    """Decorator timing an import/export job and counting its runs."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = 'error'
+            try:
+                result = func(*args, **kwargs)
+                outcome = 'ok'
+                return result
+            finally:
+                observe('innoventory_job_duration_seconds', time.perf_counter() - start, job=job)
+                inc('innoventory_job_runs_total', job=job, outcome=outcome)
+                maybe_flush()
+        return wrapper
+    return decorator
+
+
+def metrics_dir():
+    path = getattr(settings, 'METRICS_DIR', None) or os.path.join(tempfile.gettempdir(), 'innoventory-metrics')
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _snapshot():
+    with _lock:
+        return {
+            'histograms': [
+                [name, dict(labels), list(entry[0]), entry[1], entry[2]]
+                for (name, labels), entry in _histograms.items()
+            ],
+            'counters': [
+                [name, dict(labels), value]
+                for (name, labels), value in _counters.items()
+            ],
+        }
+
+
+class _DirectoryLock:
+    """Exclusive lock serialising archive compaction and collection across workers."""
+
+    def __init__(self, directory):
+        self.path = directory / '.lock'
+
+    def __enter__(self):
+        self.fh = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self.fh, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.fh.close()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _dead_worker_files(directory, include_own):
+    paths = []
+    for path in directory.glob('metrics-*.json'):
+        try:
+            pid = int(path.stem.split('-', 1)[1])
+        except ValueError:
+            continue  # the archive
+        if pid == os.getpid() and not include_own:
+            continue
+        if pid == os.getpid() or not _pid_alive(pid):
+            paths.append(path)
+    return paths
+
+
+def _merge_file(path, histograms, counters):
+    try:
+        with open(path) as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return
+    for name, labels, counts, total, count in data.get('histograms', []):
+        if name not in HISTOGRAMS:
+            continue
+        entry = histograms.setdefault(_key(name, labels), [[0] * len(counts), 0.0, 0])
+        entry[0] = [a + b for a, b in zip(entry[0], counts)]
+        entry[1] += total
+        entry[2] += count
+    for name, labels, value in data.get('counters', []):
+        key = _key(name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+
+def _compact(directory, include_own=False):
+    """Fold the files of exited workers into the archive; call with the directory lock held."""
+    dead = _dead_worker_files(directory, include_own)
+    if not dead:
+        return 0
+    histograms, counters = {}, {}
+    archive = directory / ARCHIVE
+    for path in [archive, *dead]:
+        _merge_file(path, histograms, counters)
+    tmp = directory / f'.archive-{os.getpid()}.tmp'
+    with open(tmp, 'w') as fh:
+        json.dump({
+            'histograms': [[name, dict(labels), *entry] for (name, labels), entry in histograms.items()],
+            'counters': [[name, dict(labels), value] for (name, labels), value in counters.items()],
+        }, fh)
+    os.replace(tmp, archive)
+    for path in dead:
+        path.unlink(missing_ok=True)
+    return len(dead)
+
+
+def flush():
+    global _last_flush, _compacted
+    directory = metrics_dir()
+    if not _compacted:
+        # A file under our pid before our first flush belongs to a dead predecessor.
+        with _DirectoryLock(directory):
+            _compact(directory, include_own=True)
+        _compacted = True
+    target = directory / f'metrics-{os.getpid()}.json'
+    tmp = directory / f'.metrics-{os.getpid()}.tmp'
+    with open(tmp, 'w') as fh:
+        json.dump(_snapshot(), fh)
+    os.replace(tmp, target)
+    _last_flush = time.monotonic()
+
+
+def maybe_flush():
+    interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+    if time.monotonic() - _last_flush >= interval:
+        try:
+            flush()
+        except OSError:
+            pass
+
+
+def collect():
+    """Merge the snapshots written by every worker, live or archived."""
+    flush()
+    directory = metrics_dir()
+    histograms = {}
+    counters = {}
+    with _DirectoryLock(directory):
+        _compact(directory)
+        for path in directory.glob('metrics-*.json'):
+            _merge_file(path, histograms, counters)
+    return histograms, counters
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def render_prometheus():
+    histograms, counters = collect()
+    lines = []
+
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        series = sorted((labels, entry) for (metric, labels), entry in histograms.items() if metric == name)
+        if not series:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{_format_labels(labels + (("le", bound),))} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {count}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+
+    for name, help_text in COUNTERS.items():
+        series = sorted((labels, value) for (metric, labels), value in counters.items() if metric == name)
+        if not series:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for labels, value in series:
+            lines.append(f'{name}{_format_labels(labels)} {value}')
+
+    return '\n'.join(lines) + '\n'
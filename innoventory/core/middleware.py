@@ -0,0 +1,117 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connection
+
+from . import cache as app_cache, metrics, recording, slow_queries
+
+logger = logging.getLogger(__name__)
+
+
+class QueryTimer:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or '<unnamed>'
+
+
+class MetricsMiddleware:
+    """Record latency, DB time, query count and response size per URL name."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        view = view_name(request)
+        metrics.observe('innoventory_request_duration_seconds', elapsed, view=view)
+        metrics.observe('innoventory_request_db_seconds', timer.duration, view=view)
+        metrics.observe('innoventory_request_queries', timer.count, view=view)
+        if not response.streaming:
+            metrics.observe('innoventory_response_size_bytes', len(response.content), view=view)
+        metrics.maybe_flush()
+        return response
+
+
+class SlowQueryMiddleware:
+    """Opt-in recorder storing statements above SLOW_QUERY_THRESHOLD_MS."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SLOW_QUERY_LOG_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        collector = slow_queries.SlowQueryCollector(settings.SLOW_QUERY_THRESHOLD_MS)
+        with connection.execute_wrapper(collector):
+            response = self.get_response(request)
+
+        # Persist after the view so EXPLAIN and the log writes are not timed
+        # and never run inside the view's own transaction.
+        view = view_name(request)
+        for sql, params, many, duration_ms in collector.captured:
+            try:
+                slow_queries.record(sql, params, many, duration_ms, view_name=view)
+            except DatabaseError:
+                logger.exception("Could not record slow query for %s", view)
+        return response
+
+
+class RequestRecorderMiddleware:
+    """Opt-in recorder of sanitized request metadata for replay_requests."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_RECORDING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started_at = time.time()
+        start = time.perf_counter()
+        response = self.get_response(request)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        view = view_name(request)
+        if view not in ('metrics', '<unresolved>'):
+            try:
+                recording.record(request, response, view, duration_ms, started_at)
+            except OSError:
+                logger.exception("Could not record request to %s", request.path)
+        return response
+
+
+class CacheSyncMiddleware:
+    """Apply cache namespace bumps made by other workers (see core.cache.sync)."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'CACHE_SYNC_INTERVAL', 0):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            app_cache.sync()
+        except DatabaseError:
+            logger.exception("Could not poll cache namespace versions")
+        return self.get_response(request)
@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.db import models
+
+
+class QueryFingerprint(models.Model):
+    fingerprint = models.CharField(max_length=40, unique=True)
+    normalized_sql = models.TextField()
+    calls = models.PositiveBigIntegerField(default=0)
+    total_duration_ms = models.FloatField(default=0)
+    max_duration_ms = models.FloatField(default=0)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-total_duration_ms']
+        verbose_name = "Slow Query Fingerprint"
+
+    @property
+    def mean_duration_ms(self):
+        return self.total_duration_ms / self.calls if self.calls else 0
+
+    def __str__(self):
+        return self.normalized_sql[:80]
+
+
+class SlowQuery(models.Model):
+    fingerprint = models.CharField(max_length=40, db_index=True)
+    sql = models.TextField()
+    params = models.TextField(blank=True)
+    view_name = models.CharField(max_length=200, blank=True, db_index=True)
+    duration_ms = models.FloatField()
+    plan = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = "Slow Queries"
+
+    def __str__(self):
+        return f"{self.duration_ms:.0f}ms - {self.view_name or 'unknown view'}"
+
+
+class IdempotencyKey(models.Model):
+    key = models.CharField(max_length=64)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='idempotency_keys')
+    view_name = models.CharField(max_length=200)
+    request_hash = models.CharField(max_length=64)
+    # Null while the first request is still running.
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.BinaryField(blank=True, default=b'')
+    response_headers = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_user_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} - {self.view_name} [{self.status_code or 'in flight'}]"
+
+
+class CacheNamespaceVersion(models.Model):
+    """Shared version of an application cache namespace, polled by every worker."""
+    namespace = models.CharField(max_length=32, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['namespace']
+
+    def __str__(self):
+        return f"{self.namespace} v{self.version}"
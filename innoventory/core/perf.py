@@ -0,0 +1,41 @@
+"""Helpers shared by the benchmark, stress and replay commands."""
+import math
+import statistics
+
+from django.contrib.auth import get_user_model
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted sequence."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(durations_ms):
+    if not durations_ms:
+        return {'count': 0}
+    return {
+        'count': len(durations_ms),
+        'min_ms': round(min(durations_ms), 3),
+        'mean_ms': round(statistics.fmean(durations_ms), 3),
+        'p50_ms': round(percentile(durations_ms, 50), 3),
+        'p95_ms': round(percentile(durations_ms, 95), 3),
+        'p99_ms': round(percentile(durations_ms, 99), 3),
+        'max_ms': round(max(durations_ms), 3),
+    }
+
+
+def get_benchmark_user(role='admin'):
+    User = get_user_model()
+    user, _ = User.objects.get_or_create(
+        username=f'benchmark_{role}',
+        defaults={
+            'role': role,
+            'email': f'benchmark_{role}@innoventory.local',
+            'phone_number': f'bench-{role}',
+        },
+    )
+    return user
@@ -0,0 +1,85 @@
+"""
+Sanitized request recording for load-test replay.
+
+Each worker appends JSON lines to ``<REQUEST_RECORDING_DIR>/requests-<pid>.jsonl``
+through a rotating handler; ``manage.py replay_requests`` merges the files by
+timestamp.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+
+DROPPED_FIELDS = re.compile(r'csrf|password|passwd|secret|token|idempotency', re.I)
+PSEUDONYMIZED_FIELDS = {'customer_name', 'customer_contact', 'email', 'phone_number', 'username', 'first_name', 'last_name'}
+MAX_VALUE_LENGTH = 200
+
+_logger = None
+
+
+def recording_dir():
+    path = getattr(settings, 'REQUEST_RECORDING_DIR', None) or os.path.join(tempfile.gettempdir(), 'innoventory-requests')
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def get_logger():
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger(f'innoventory.request_recorder.{os.getpid()}')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        handler = RotatingFileHandler(
+            recording_dir() / f'requests-{os.getpid()}.jsonl',
+            maxBytes=getattr(settings, 'REQUEST_RECORDING_MAX_BYTES', 10 * 1024 * 1024),
+            backupCount=getattr(settings, 'REQUEST_RECORDING_BACKUPS', 5),
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        _logger = logger
+    return _logger
+
+
+def _pseudonym(value):
+    return 'anon-' + hashlib.sha1(value.encode()).hexdigest()[:10] if value else value
+
+
+def sanitize(querydict):
+    cleaned = {}
+    for key, values in querydict.lists():
+        if DROPPED_FIELDS.search(key):
+            continue
+        if key in PSEUDONYMIZED_FIELDS:
+            values = [_pseudonym(v) for v in values]
+        cleaned[key] = [v[:MAX_VALUE_LENGTH] for v in values]
+    return cleaned
+
+
+def record(request, response, view, duration_ms, started_at):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        role = getattr(user, 'role', '') or 'user'
+    else:
+        role = 'anonymous'
+
+    entry = {
+        'ts': round(started_at, 4),
+        'method': request.method,
+        'path': request.path,
+        'view': view,
+        'query': sanitize(request.GET),
+        'form': sanitize(request.POST) if request.method == 'POST' else {},
+        'files': sorted(request.FILES.keys()) if request.method == 'POST' else [],
+        'htmx': bool(request.headers.get('HX-Request')),
+        'role': role,
+        'status': response.status_code,
+        'duration_ms': round(duration_ms, 3),
+    }
+    get_logger().info(json.dumps(entry, separators=(',', ':')))
@@ -0,0 +1,42 @@
+from collections import defaultdict
+
+from django.db.models.signals import post_delete, post_save
+
+from accounts.models import CustomUser
+from products.models import Category, InventorySettings, Product, StockTransaction
+from sales.models import Customer, Payment, Sale, SaleLine
+from suppliers.models import Supplier
+
+from . import cache as app_cache
+
+# Models whose writes bump each application cache namespace (see core.cache).
+NAMESPACE_SOURCES = {
+    'products': (Product, Category, Supplier, StockTransaction),
+    'sales': (Sale, SaleLine, Payment),
+    'credits': (Sale, Payment, Customer),
+    'reports': (Sale, SaleLine, Payment, Product, Category),
+    'settings': (InventorySettings,),
+    'users': (CustomUser,),
+    # Changes that show up in cached fragments without bumping Product.date_modified.
+    'fragments': (InventorySettings, Category, Supplier),
+    # Stock-independent product lookups (autocomplete) and category choices.
+    'catalog': (Product,),
+    'categories': (Category,),
+}
+# Per namespace, the fields of a source model it ignores on update_fields saves.
+IGNORED_FIELDS = {
+    'catalog': Product.STOCK_FIELDS,
+}
+
+
+def connect():
+    namespaces_by_model = defaultdict(list)
+    for namespace, models in NAMESPACE_SOURCES.items():
+        for model in models:
+            namespaces_by_model[model].append(namespace)
+    for model, namespaces in namespaces_by_model.items():
+        receiver = app_cache.bump_receiver(
+            *namespaces, ignored_fields={ns: IGNORED_FIELDS[ns] for ns in namespaces if ns in IGNORED_FIELDS},
+        )
+        post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f'cache-save-{model.__name__}')
+        post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f'cache-delete-{model.__name__}')
@@ -0,0 +1,96 @@
+import hashlib
+import re
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _PLACEHOLDER_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.sha1(normalize_sql(sql).encode()).hexdigest()
+
+
+class SlowQueryCollector:
+    """execute_wrapper buffering statements slower than the threshold."""
+
+    def __init__(self, threshold_ms):
+        self.threshold_ms = threshold_ms
+        self.captured = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if duration_ms >= self.threshold_ms:
+                self.captured.append((sql, params, many, duration_ms))
+
+
+def explain(sql, params):
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return ''
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            rows = cursor.fetchall()
+    except DatabaseError as e:
+        return f"EXPLAIN failed: {e}"
+    return '\n'.join(' '.join(str(col) for col in row) for row in rows)
+
+
+def record(sql, params, many, duration_ms, view_name=''):
+    from .models import QueryFingerprint, SlowQuery
+
+    digest = fingerprint(sql)
+    now = timezone.now()
+    SlowQuery.objects.create(
+        fingerprint=digest,
+        sql=sql,
+        params=repr(params)[:2000],
+        view_name=view_name,
+        duration_ms=duration_ms,
+        plan='' if many or not getattr(settings, 'SLOW_QUERY_EXPLAIN', True) else explain(sql, params),
+    )
+
+    updated = QueryFingerprint.objects.filter(fingerprint=digest).update(
+        calls=F('calls') + 1,
+        total_duration_ms=F('total_duration_ms') + duration_ms,
+        max_duration_ms=Greatest(F('max_duration_ms'), duration_ms),
+        last_seen=now,
+    )
+    if not updated:
+        _, created = QueryFingerprint.objects.get_or_create(
+            fingerprint=digest,
+            defaults={
+                'normalized_sql': normalize_sql(sql),
+                'calls': 1,
+                'total_duration_ms': duration_ms,
+                'max_duration_ms': duration_ms,
+                'last_seen': now,
+            },
+        )
+        if not created:
+            # Lost the insert race to another worker; fold into its row.
+            QueryFingerprint.objects.filter(fingerprint=digest).update(
+                calls=F('calls') + 1,
+                total_duration_ms=F('total_duration_ms') + duration_ms,
+                max_duration_ms=Greatest(F('max_duration_ms'), duration_ms),
+                last_seen=now,
+            )
@@ -0,0 +1,242 @@
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import CustomUser
+from products.models import Category, Product
+from sales.models import Payment, Sale
+from suppliers.models import Supplier
+
+from . import cache as app_cache
+from . import events, metrics
+from .fragments import fragment_version
+from .idempotency import idempotent
+from .models import CacheNamespaceVersion, IdempotencyKey
+
+SYNC_INTERVAL = 0.5
+
+
+def _reader(ready, bumped, results):
+    """Worker holding a cached entry; reports how long the other worker's bump took to reach it."""
+    connections.close_all()
+    cache.clear()  # the forked LocMem copy belongs to the parent
+    app_cache.sync(force=True)
+    app_cache.get_or_set('products', 'probe', lambda: 'old', 300)
+    ready.set()
+    bumped.wait(10)
+    start = time.monotonic()
+    stale_before_sync = app_cache.get_value('products', 'probe') == 'old'
+    value = 'old'
+    while value == 'old' and time.monotonic() - start < SYNC_INTERVAL * 10:
+        app_cache.sync()
+        value = app_cache.get_or_set('products', 'probe', lambda: 'new', 300)
+        time.sleep(0.02)
+    results.put((stale_before_sync, value, time.monotonic() - start))
+    connections.close_all()
+
+
+def _writer(bumped):
+    connections.close_all()
+    cache.clear()
+    app_cache.bump('products')
+    bumped.set()
+    connections.close_all()
+
+
+@override_settings(CACHE_SYNC_INTERVAL=SYNC_INTERVAL)
+class CrossWorkerInvalidationTests(TransactionTestCase):
+    def test_bump_reaches_other_worker_processes_within_interval(self):
+        ctx = multiprocessing.get_context('fork')
+        ready = [ctx.Event() for _ in range(2)]
+        bumped = ctx.Event()
+        results = ctx.Queue()
+        connections.close_all()
+        readers = [ctx.Process(target=_reader, args=(r, bumped, results)) for r in ready]
+        for process in readers:
+            process.start()
+        for event in ready:
+            self.assertTrue(event.wait(10))
+        writer = ctx.Process(target=_writer, args=(bumped,))
+        writer.start()
+
+        outcomes = [results.get(timeout=20) for _ in readers]
+        for process in [*readers, writer]:
+            process.join(10)
+            self.assertEqual(process.exitcode, 0)
+        for stale_before_sync, value, elapsed in outcomes:
+            # Each worker's local cache only learns about the bump through the table.
+            self.assertTrue(stale_before_sync)
+            self.assertEqual(value, 'new')
+            self.assertLess(elapsed, SYNC_INTERVAL * 2)
+
+    def test_first_sync_records_a_baseline(self):
+        app_cache.bump('settings')
+        app_cache._seen = None
+        self.assertEqual(app_cache.sync(force=True), [])
+        app_cache.bump('settings')
+        self.assertEqual(app_cache.sync(force=True), ['settings'])
+
+    def test_bump_waits_for_commit(self):
+        before = app_cache.versions('sales')
+        with transaction.atomic():
+            app_cache.bump('sales')
+            self.assertEqual(app_cache.versions('sales'), before)
+            self.assertFalse(CacheNamespaceVersion.objects.filter(namespace='sales').exists())
+        self.assertNotEqual(app_cache.versions('sales'), before)
+        self.assertTrue(CacheNamespaceVersion.objects.filter(namespace='sales').exists())
+
+    def test_category_rename_publishes_fragment_version(self):
+        app_cache.sync(force=True)
+        category = Category.objects.create(name='Grains')
+        self.assertEqual(app_cache.sync(force=True), ['categories', 'fragments', 'products', 'reports'])
+        before = fragment_version()
+        category.name = 'Cereals'
+        category.save()
+        self.assertNotEqual(fragment_version(), before)
+        self.assertIn('fragments', app_cache.sync(force=True))
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        # Cached users and pages outlive a test: TestCase never commits, so no bump clears them.
+        cache.clear()
+        self.user = CustomUser.objects.create(username='clerk', email='clerk@test.local', phone_number='1')
+        self.calls = 0
+
+        @idempotent
+        def view(request):
+            self.calls += 1
+            return HttpResponse(f'call {self.calls}', status=201, headers={'HX-Trigger': 'saleListChanged'})
+        self.view = view
+
+    def post(self, data, key='key-1'):
+        request = RequestFactory().post('/sales/create/', data, HTTP_IDEMPOTENCY_KEY=key)
+        request.user = self.user
+        return self.view(request)
+
+    def test_retry_replays_the_stored_response_without_running_the_view(self):
+        first = self.post({'product': '1', 'quantity': '2'})
+        retry = self.post({'product': '1', 'quantity': '2'})
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual((retry.status_code, retry.content), (201, b'call 1'))
+        self.assertEqual(retry['HX-Trigger'], 'saleListChanged')
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertNotIn('Idempotent-Replayed', first)
+
+    def test_key_still_in_flight_returns_409(self):
+        self.post({'product': '1'})
+        IdempotencyKey.objects.update(status_code=None)
+
+        response = self.post({'product': '1'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(self.calls, 1)
+
+    def test_key_reused_with_a_different_body_returns_422(self):
+        self.post({'product': '1', 'quantity': '2'})
+        response = self.post({'product': '1', 'quantity': '3'})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(self.calls, 1)
+
+    def test_new_key_runs_the_view_again(self):
+        self.post({'product': '1'}, key='key-1')
+        self.post({'product': '1'}, key='key-2')
+        self.assertEqual(self.calls, 2)
+
+    def test_double_submitted_payment_is_recorded_once(self):
+        supplier = Supplier.objects.create(name='Supplier', contact='n/a', email='s@test.local')
+        product = Product.objects.create(
+            name='Rice', category=Category.objects.create(name='Grains'), supplier=supplier, price=10, stock_quantity=5
+        )
+        sale = Sale.objects.create(product_sold=product, product_qty=1, total=100, sales_type='credit')
+        self.client.force_login(self.user)
+        url = reverse('record_payment', args=[sale.pk])
+        data = {'payment_amount': '25', 'idempotency_key': 'pay-1'}
+
+        responses = [self.client.post(url, data) for _ in range(2)]
+
+        self.assertEqual([r.status_code for r in responses], [204, 204])
+        self.assertEqual(Payment.objects.filter(sale=sale).count(), 1)
+        sale.refresh_from_db()
+        self.assertEqual(sale.balance, 75)
+
+
+class EventCursorTests(TestCase):
+    def setUp(self):
+        supplier = Supplier.objects.create(name='Supplier', contact='n/a', email='s@test.local')
+        self.product = Product.objects.create(
+            name='Rice', category=Category.objects.create(name='Grains'), supplier=supplier, price=10, stock_quantity=5
+        )
+        self.state = {'high': 0, 'gaps': {}}
+
+    def sale(self, sale_id):
+        return Sale.objects.create(sale_id=sale_id, product_sold=self.product, product_qty=1, total=10)
+
+    def poll(self, now=0):
+        return [sale.sale_id for sale in events._new_rows(Sale.objects.all(), self.state, now)]
+
+    def test_sale_committed_after_a_higher_id_is_still_streamed_once(self):
+        self.sale(1)
+        self.sale(3)  # sale 2's transaction has not committed yet
+        self.assertEqual(self.poll(), [1, 3])
+        self.assertEqual(self.poll(), [])
+
+        self.sale(2)
+        self.assertEqual(self.poll(), [2])
+        self.assertEqual(self.poll(), [])
+        self.assertEqual(self.state, {'high': 3, 'gaps': {}})
+
+    def test_gaps_from_rolled_back_inserts_expire(self):
+        self.sale(3)
+        self.assertEqual(self.poll(now=0), [3])
+        self.assertEqual(set(self.state['gaps']), {1, 2})
+        self.assertEqual(self.poll(now=events.GAP_TIMEOUT + 1), [])
+        self.assertEqual(self.state['gaps'], {})
+
+
+class MetricsArchiveTests(TestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir)
+        override = override_settings(METRICS_DIR=str(self.dir))
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def dead_worker_file(self, rows):
+        process = subprocess.Popen(['true'])
+        process.wait()
+        path = self.dir / f'metrics-{process.pid}.json'
+        path.write_text(json.dumps({
+            'histograms': [],
+            'counters': [['innoventory_job_rows_total', {'job': 'archive-test'}, rows]],
+        }))
+        return path
+
+    def rows(self):
+        return metrics.collect()[1].get(metrics._key('innoventory_job_rows_total', {'job': 'archive-test'}), 0)
+
+    def test_exited_worker_files_fold_into_the_archive(self):
+        first = self.dead_worker_file(5)
+        self.assertEqual(self.rows(), 5)
+        self.assertFalse(first.exists())
+        self.assertTrue((self.dir / metrics.ARCHIVE).exists())
+
+        self.dead_worker_file(2)
+        self.assertEqual(self.rows(), 7)
+        self.assertEqual(self.rows(), 7)
+        self.assertEqual(
+            sorted(path.name for path in self.dir.glob('metrics-*.json')),
+            sorted([metrics.ARCHIVE, f'metrics-{os.getpid()}.json']),
+        )
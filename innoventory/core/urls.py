@@ -0,0 +1,12 @@
+from django.conf import settings
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('metrics/', views.metrics_view, name='metrics'),
+    path('badges/<slug:name>/', views.badge_count, name='badge_count'),
+]
+
+# The SSE stream never ends; it only makes sense under ASGI.
+if settings.LIVE_UPDATES_ENABLED:
+    urlpatterns.append(path('events/', views.event_stream, name='event_stream'))
@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
+
+from . import metrics
+from .badges import get_badge_counts
+from .events import get_broker
+
+
+def _scrape_token_ok(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    auth = request.headers.get('Authorization', '')
+    return bool(token) and auth.startswith('Bearer ') and constant_time_compare(auth[7:], token)
+
+
+def metrics_view(request):
+    is_admin = request.user.is_authenticated and request.user.role == 'admin'
+    if not (is_admin or _scrape_token_ok(request)):
+        raise PermissionDenied
+    return HttpResponse(metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@login_required
+def badge_count(request, name):
+    counts = get_badge_counts()
+    if name not in counts:
+        raise Http404
+    return HttpResponse(str(counts[name]))
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def event_stream(request):
+    user = await request.auser()
+    if not user.is_authenticated:
+        raise PermissionDenied
+
+    broker = get_broker()
+    queue = broker.subscribe()
+    heartbeat = getattr(settings, 'EVENTS_HEARTBEAT_INTERVAL', 15)
+    badges = await sync_to_async(get_badge_counts, thread_sensitive=False)()
+
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            yield _sse('badges', badges)
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(event, data)
+        finally:
+            broker.unsubscribe(queue)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
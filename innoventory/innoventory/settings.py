@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 from pathlib import Path
 import os
+import tempfile
 import dj_database_url
 from dotenv import load_dotenv
 
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
     'sales',
     'suppliers',
     'reports',
+    'core',
     'django.contrib.humanize'
 ]
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
@@ -49,13 +51,68 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.SlowQueryMiddleware',
+    'core.middleware.CacheSyncMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.RequestRecorderMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+# Metrics
+# Each worker dumps its counters to METRICS_DIR; /metrics/ merges them.
+METRICS_DIR = os.environ.get("METRICS_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "5"))
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Slow query log (opt-in): statements above the threshold are stored with
+# their EXPLAIN output and browsable under Core & Monitoring in the admin.
+SLOW_QUERY_LOG_ENABLED = os.environ.get("SLOW_QUERY_LOG_ENABLED", "False").lower() == "true"
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "True").lower() == "true"
+
+# Request recording (opt-in) for `manage.py replay_requests`.
+REQUEST_RECORDING_ENABLED = os.environ.get("REQUEST_RECORDING_ENABLED", "False").lower() == "true"
+REQUEST_RECORDING_DIR = os.environ.get("REQUEST_RECORDING_DIR", "")
+REQUEST_RECORDING_MAX_BYTES = int(os.environ.get("REQUEST_RECORDING_MAX_BYTES", str(10 * 1024 * 1024)))
+REQUEST_RECORDING_BACKUPS = int(os.environ.get("REQUEST_RECORDING_BACKUPS", "5"))
+
+# Overdue credits are flipped by `manage.py sweep_overdue` (cron) or, when
+# enabled, by a daily in-process scheduler thread in each worker.
+OVERDUE_SWEEPER_IN_PROCESS = os.environ.get("OVERDUE_SWEEPER_IN_PROCESS", "False").lower() == "true"
+
+# Seconds the header badge counts are cached; writes invalidate them early.
+BADGE_COUNTS_TTL = int(os.environ.get("BADGE_COUNTS_TTL", "30"))
+
+# Upper bound on a cached product price/stock lookup; product saves drop it sooner.
+PRICE_CACHE_TTL = int(os.environ.get("PRICE_CACHE_TTL", "60"))
+
+# Product picker: results per search and how long a search is cached.
+AUTOCOMPLETE_LIMIT = int(os.environ.get("AUTOCOMPLETE_LIMIT", "10"))
+AUTOCOMPLETE_CACHE_TTL = int(os.environ.get("AUTOCOMPLETE_CACHE_TTL", "60"))
+
+# How long an open sale holds the stock it has picked (`manage.py sweep_reservations`
+# deletes expired holds; they stop counting as soon as they expire).
+RESERVATION_TTL_SECONDS = int(os.environ.get("RESERVATION_TTL_SECONDS", "300"))
+
+# Dashboard live updates (/events/). Only enable this when serving through
+# innoventory.asgi (e.g. uvicorn or gunicorn's uvicorn worker): under WSGI every
+# open stream pins a sync worker forever. Off, dashboards poll their badges.
+LIVE_UPDATES_ENABLED = os.environ.get("LIVE_UPDATES_ENABLED", "False").lower() == "true"
+EVENTS_POLL_INTERVAL = float(os.environ.get("EVENTS_POLL_INTERVAL", "2"))
+EVENTS_HEARTBEAT_INTERVAL = float(os.environ.get("EVENTS_HEARTBEAT_INTERVAL", "15"))
+
+# Threads (and so extra database connections) per process used by the async
+# dashboards to run their queries concurrently.
+DASHBOARD_QUERY_CONCURRENCY = int(os.environ.get("DASHBOARD_QUERY_CONCURRENCY", "3"))
+
+# Stored responses for idempotent sale/payment submissions are kept this long;
+# `manage.py purge_idempotency_keys` deletes older ones.
+IDEMPOTENCY_KEY_TTL_HOURS = float(os.environ.get("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+
 LOGIN_REDIRECT_URL = '/accounts/dashboard/'
 LOGIN_URL = '/accounts/login/'
 LOGOUT_REDIRECT_URL = '/accounts/login/'
@@ -67,24 +124,91 @@ STATICFILES_DIRS = [
 
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Compiled templates are kept in memory (runserver still reloads them on change).
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if os.environ.get("TEMPLATE_CACHED_LOADER", "True").lower() == "true":
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+
+# Seconds sidebar, header and product-row fragments stay cached; 0 disables them.
+FRAGMENT_CACHE_TTL = int(os.environ.get("FRAGMENT_CACHE_TTL", "600"))
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.template.context_processors.debug',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.badge_counts',
+                'core.context_processors.fragment_cache',
+                'core.context_processors.live_updates',
             ],
+            'loaders': TEMPLATE_LOADERS,
         },
     },
 ]
 
 WSGI_APPLICATION = 'innoventory.wsgi.application'
 
+# Caches. CACHE_BACKEND picks the backend for both aliases:
+#   locmem (default) - per process; other workers learn about invalidations
+#                      by polling the namespace table (CACHE_SYNC_INTERVAL).
+#   file             - shared by every worker on the host, under CACHE_LOCATION
+#                      (default: <tmp>/innoventory-cache/<alias>).
+#   redis            - shared across hosts; needs the `redis` package and
+#                      CACHE_LOCATION (default: redis://127.0.0.1:6379/1).
+# "sessions" backs SESSION_ENGINE=cached_db.
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem")
+CACHE_LOCATION = os.environ.get("CACHE_LOCATION", "")
+
+
+def _cache(alias, **options):
+    if CACHE_BACKEND == "redis":
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_LOCATION or 'redis://127.0.0.1:6379/1',
+            'KEY_PREFIX': alias,
+        }
+    if CACHE_BACKEND == "file":
+        return {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(CACHE_LOCATION or os.path.join(tempfile.gettempdir(), 'innoventory-cache'), alias),
+            'OPTIONS': options,
+        }
+    return {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': f'innoventory-{alias}',
+        'OPTIONS': options,
+    }
+
+
+CACHES = {
+    'default': _cache('default'),
+    'sessions': _cache('sessions', MAX_ENTRIES=10000),
+}
+
+# Seconds between polls of the shared namespace version table. Workers with a
+# local-memory cache need it to see each other's invalidations; shared
+# backends (file, redis) already do, so it is off for them. 0 disables.
+CACHE_SYNC_INTERVAL = float(os.environ.get("CACHE_SYNC_INTERVAL", "2" if CACHE_BACKEND == "locmem" else "0"))
+
+# cached_db reads sessions from the cache and falls back to (and writes
+# through to) the database. It serves a cache hit without checking the
+# database, so a logout is only seen by workers sharing that cache: with the
+# per-process locmem backend sessions stay in the database. The file backend
+# is shared per host only; use redis when running on several hosts.
+SESSION_ENGINE = os.environ.get(
+    "SESSION_ENGINE",
+    "django.contrib.sessions.backends.db" if CACHE_BACKEND == "locmem" else "django.contrib.sessions.backends.cached_db",
+)
+SESSION_CACHE_ALIAS = 'sessions'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -100,6 +224,10 @@ DATABASES = {
  ssl_require=True
  )
 }
+# SQLite runs the tests in memory, which worker processes started by the
+# tests cannot share; keep the test database in a file instead.
+if DATABASES['default'].get('ENGINE') == 'django.db.backends.sqlite3':
+    DATABASES['default']['TEST'] = {'NAME': str(BASE_DIR / 'test_db.sqlite3')}
 
 # DATABASES = {
 #     'default': {
@@ -117,6 +245,14 @@ DATABASES = {
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
+# The cached backend serves request.user from the cache. ModelBackend stays
+# listed so sessions created before the switch remain valid.
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", "300"))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -14,6 +14,7 @@ urlpatterns = [
     path('sales/', include('sales.urls')),
     path('suppliers/', include('suppliers.urls')),
     path('reports/', include('reports.urls')),
-    path('settings/', views.settings_view, name='settings')
+    path('settings/', views.settings_view, name='settings'),
+    path('', include('core.urls')),
 ]
 
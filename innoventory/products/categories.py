@@ -0,0 +1,27 @@
+"""
+Cached category choices, shared by ProductForm and the filter dropdowns.
+
+The list lives in its own "categories" cache namespace, bumped only by
+Category writes (including the inline new-category path), so sales and
+stock movements never throw it away.
+"""
+from core import cache as app_cache
+
+from .models import Category
+
+CACHE_TIMEOUT = 60 * 60
+
+
+def _load():
+    return list(Category.objects.order_by('name').values('id', 'name'))
+
+
+def get_categories():
+    """All categories as [{'id', 'name'}] ordered by name."""
+    return app_cache.get_or_set('categories', 'choices', _load, CACHE_TIMEOUT)
+
+
+def category_form_choices():
+    return [('', '---------'), ('__new__', '➕ Add New Category')] + [
+        (category['id'], category['name']) for category in get_categories()
+    ]
@@ -1,7 +1,9 @@
 from django import forms
-from .models import Product, Category, StockTransaction, InventorySettings
+from .models import Product, StockTransaction, InventorySettings
+from .widgets import ProductAutocompleteWidget
+from .categories import category_form_choices
 from django import forms
-from .models import Product, Category
+from .models import Product
 
 class ProductForm(forms.ModelForm):
     class Meta:
@@ -46,11 +48,7 @@ class ProductForm(forms.ModelForm):
             if name != 'is_tracked':
                 field.widget.attrs.setdefault('class', 'form-control')
 
-        category_choices = [('', '---------'), ('__new__', '➕ Add New Category')]
-        category_choices.extend(
-            (cat.id, cat.name) for cat in Category.objects.all().order_by('name')
-        )
-        self.fields['category'].choices = category_choices
+        self.fields['category'].choices = category_form_choices()
         self.fields['category'].required = False
 
     def clean(self):
@@ -101,8 +99,10 @@ class StockTransactionForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         for field in self.fields.values():
             field.widget.attrs.update({'class': 'form-control'})
+        self.fields['product'].widget = ProductAutocompleteWidget()
         if self.instance and self.instance.pk:
             self.fields['product'].disabled = True
+            self.fields['product'].widget.attrs['disabled'] = True
 
     def clean_quantity(self):
         quantity = self.cleaned_data.get('quantity')
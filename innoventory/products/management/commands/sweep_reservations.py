@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from products.reservations import sweep_expired_reservations
+
+
+class Command(BaseCommand):
+    help = "Delete expired stock reservations. Safe to run every few minutes (e.g. from cron)."
+
+    def handle(self, *args, **opts):
+        deleted = sweep_expired_reservations()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired reservation(s)."))
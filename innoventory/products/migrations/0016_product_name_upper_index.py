@@ -0,0 +1,41 @@
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+INDEX_NAME = 'product_name_upper_idx'
+
+
+def _index(schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        from django.contrib.postgres.indexes import OpClass
+
+        # UPPER(name) LIKE 'X%' needs the pattern opclass outside the C locale.
+        return models.Index(OpClass(Upper('name'), name='text_pattern_ops'), name=INDEX_NAME)
+    return models.Index(Upper('name'), name=INDEX_NAME)
+
+
+def add_index(apps, schema_editor):
+    schema_editor.add_index(apps.get_model('products', 'Product'), _index(schema_editor))
+
+
+def remove_index(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model('products', 'Product'), _index(schema_editor))
+
+
+class Migration(migrations.Migration):
+    """
+    Index for the case-insensitive prefix search in product_autocomplete.
+
+    istartswith compiles to UPPER(name::text) LIKE UPPER(...) on PostgreSQL,
+    which neither the plain name index nor its _like index can serve, so the
+    view filters on Upper('name') with startswith and this index matches
+    that expression. The opclass is PostgreSQL-only, hence RunPython rather
+    than Meta.indexes.
+    """
+
+    dependencies = [
+        ('products', '0015_stockreservation'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_index, remove_index),
+    ]
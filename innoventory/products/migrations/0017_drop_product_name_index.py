@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:36
+
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+INDEX_NAME = 'product_name_upper_idx'
+
+
+def restore_upper_index(apps, schema_editor):
+    # SQLite applies AlterField by rebuilding the table, which drops indexes
+    # the model state does not know about, such as the one from 0016.
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.add_index(apps.get_model('products', 'Product'), models.Index(Upper('name'), name=INDEX_NAME))
+
+
+class Migration(migrations.Migration):
+    """
+    Drop the plain index on Product.name.
+
+    Autocomplete filters on Upper('name') and is served by
+    product_name_upper_idx (0016); nothing else looks names up by equality
+    or prefix, so the plain index only cost an extra write per save.
+    """
+
+    dependencies = [
+        ('products', '0016_product_name_upper_index'),
+    ]
+
+    operations = [
+        # Runs backwards after the reverse AlterField has rebuilt the table.
+        migrations.RunPython(migrations.RunPython.noop, restore_upper_index),
+        migrations.AlterField(
+            model_name='product',
+            name='name',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.RunPython(restore_upper_index, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from django.db.models import Case, When, Value, F, ExpressionWrapper, FloatField, IntegerField
@@ -76,6 +77,9 @@ class Product(models.Model):
 
     objects = ProductManager()
 
+    # What a stock movement writes; saves limited to these skip the catalog cache.
+    STOCK_FIELDS = ('stock_quantity', 'max_stock_recorded', 'date_modified')
+
     def save(self, *args, **kwargs):
         if self.stock_quantity > self.max_stock_recorded:
             self.max_stock_recorded = self.stock_quantity
@@ -152,25 +156,60 @@ class StockTransaction(models.Model):
     def __str__(self):
         return f"{self.get_transaction_type_display()} - {self.product.name} - {self.quantity}"
     
+    def _locked_product(self):
+        # Re-read the product under a row lock so concurrent movements
+        # cannot overwrite each other's stock_quantity.
+        self.product = Product.objects.select_for_update().get(pk=self.product_id)
+        return self.product
+
     def save(self, *args, **kwargs):
-        is_new = not self.pk
-        
-        if is_new:
+        if self.pk:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            product = self._locked_product()
             if self.transaction_type == 'IN':
-                self.product.stock_quantity += self.quantity
-            else:  
-                if self.product.stock_quantity < self.quantity:
-                    raise ValueError(f"Insufficient stock for {self.product.name}. Available: {self.product.stock_quantity}, Requested: {self.quantity}")
-                self.product.stock_quantity -= self.quantity
-            self.product.save()
-        
-        super().save(*args, **kwargs)
-    
+                product.stock_quantity += self.quantity
+            else:
+                from .reservations import available_to_sell
+                available = available_to_sell(product)
+                if available < self.quantity:
+                    raise ValueError(f"Insufficient stock for {product.name}. Available: {max(available, 0)}, Requested: {self.quantity}")
+                product.stock_quantity -= self.quantity
+            product.save(update_fields=Product.STOCK_FIELDS)
+            super().save(*args, **kwargs)
+
     def delete(self, *args, **kwargs):
-        if self.transaction_type == 'IN':
-            self.product.stock_quantity -= self.quantity
-        else:  
-            self.product.stock_quantity += self.quantity
-        self.product.save()
-        super().delete(*args, **kwargs)
+        with transaction.atomic():
+            product = self._locked_product()
+            if self.transaction_type == 'IN':
+                product.stock_quantity -= self.quantity
+            else:
+                product.stock_quantity += self.quantity
+            product.save(update_fields=Product.STOCK_FIELDS)
+            return super().delete(*args, **kwargs)
+
+
+
+class StockReservation(models.Model):
+    """Stock held for a sale that is still being entered; expires on its own."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    # Identifies one open sale modal or cart; the sale consumes its own reservations.
+    token = models.CharField(max_length=64)
+    quantity = models.PositiveIntegerField()
+    reserved_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['token', 'product'], name='reservation_token_product_uniq'),
+        ]
+        indexes = [
+            # Covers the active-reservation sum behind available-to-sell.
+            models.Index(fields=['product', 'expires_at', 'quantity'], name='reservation_active_idx'),
+            models.Index(fields=['expires_at'], name='reservation_expiry_idx'),
+        ]
 
+    def __str__(self):
+        return f"{self.product.name} x {self.quantity} until {self.expires_at:%H:%M:%S}"
@@ -0,0 +1,31 @@
+"""
+Cached price/stock lookups for the sale modals.
+
+Each product's price and stock are cached under their own key in the
+"products" namespace, so a lookup costs one cache read and never touches
+the whole catalog. The entry carries stock, so it belongs in the namespace
+that every stock movement bumps.
+"""
+import hashlib
+
+from django.conf import settings
+
+from core import cache as app_cache
+
+from .models import Product
+
+
+def get_price_info(product_id):
+    def load():
+        row = Product.objects.filter(pk=product_id).values('price', 'stock_quantity').first()
+        if row is None:
+            return None
+        info = {
+            'id': product_id,
+            'price': row['price'],
+            'stock': row['stock_quantity'],
+        }
+        info['etag'] = hashlib.md5(f"{info['price']}:{info['stock']}".encode()).hexdigest()
+        return info
+
+    return app_cache.get_or_set('products', f'price:{product_id}', load, getattr(settings, 'PRICE_CACHE_TTL', 60))
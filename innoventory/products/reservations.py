@@ -0,0 +1,79 @@
+"""
+Short-lived stock reservations for sales being entered.
+
+Opening a sale holds the picked quantity under a token for
+RESERVATION_TTL_SECONDS. Available-to-sell is stock minus every *other*
+unexpired hold, so two counters cannot both sell the last units, and the
+sale that owns a token consumes its holds inside the checkout transaction.
+Expired rows are ignored by the sums and removed by sweep_reservations.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import Product, StockReservation
+
+
+class ReservationError(ValueError):
+    def __init__(self, message, available):
+        super().__init__(message)
+        self.available = available
+
+
+def new_token():
+    return uuid.uuid4().hex
+
+
+def reserved_quantities(product_ids, exclude_token=None, now=None):
+    """Units held by unexpired reservations, per product id."""
+    active = StockReservation.objects.filter(product_id__in=product_ids, expires_at__gt=now or timezone.now())
+    if exclude_token:
+        active = active.exclude(token=exclude_token)
+    return dict(
+        active.order_by().values('product_id').annotate(total=Sum('quantity')).values_list('product_id', 'total')
+    )
+
+
+def available_to_sell(product, exclude_token=None):
+    held = reserved_quantities([product.pk], exclude_token).get(product.pk, 0)
+    return product.stock_quantity - held
+
+
+def reserve(product_id, quantity, token, user=None):
+    """
+    Hold ``quantity`` units of a product for ``token``, replacing any earlier
+    hold by the same token and restarting its TTL. A quantity of 0 releases it.
+    """
+    ttl = getattr(settings, 'RESERVATION_TTL_SECONDS', 300)
+    with transaction.atomic():
+        product = Product.objects.select_for_update().get(pk=product_id)
+        if quantity <= 0:
+            StockReservation.objects.filter(token=token, product=product).delete()
+            return None
+        now = timezone.now()
+        available = product.stock_quantity - reserved_quantities([product.pk], token, now).get(product.pk, 0)
+        if quantity > available:
+            raise ReservationError(f"Only {max(available, 0)} {product.name} available to sell.", max(available, 0))
+        reservation, _ = StockReservation.objects.update_or_create(
+            token=token,
+            product=product,
+            defaults={'quantity': quantity, 'reserved_by': user, 'expires_at': now + timedelta(seconds=ttl)},
+        )
+        reservation.available = available - quantity
+        return reservation
+
+
+def release(token, product_ids=None):
+    holds = StockReservation.objects.filter(token=token)
+    if product_ids is not None:
+        holds = holds.filter(product_id__in=product_ids)
+    holds.delete()
+
+
+def sweep_expired_reservations(now=None):
+    deleted, _ = StockReservation.objects.filter(expires_at__lte=now or timezone.now()).delete()
+    return deleted
@@ -1,3 +1,173 @@
+from datetime import timedelta
+from io import BytesIO
+
+import pandas as pd
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from core import cache as app_cache
+from sales.services import CheckoutError, checkout_cart
+from suppliers.models import Supplier
+
+from .models import Category, Product, StockReservation, StockTransaction
+from .reservations import (
+    ReservationError, available_to_sell, new_token, reserve, sweep_expired_reservations,
+)
+from .utils import import_products_from_excel
+
+
+def make_product(name='Rice', price=10, stock=10):
+    supplier = Supplier.objects.get_or_create(name='Test Supplier', defaults={'contact': 'n/a', 'email': 's@test.local'})[0]
+    category = Category.objects.get_or_create(name='Test Category')[0]
+    return Product.objects.create(name=name, category=category, supplier=supplier, price=price, stock_quantity=stock)
+
+
+class ReservationTests(TestCase):
+    def setUp(self):
+        # Cached users and pages outlive a test: TestCase never commits, so no bump clears them.
+        cache.clear()
+        self.product = make_product(stock=10)
+
+    def test_holds_reduce_what_other_sales_can_sell(self):
+        mine, theirs = new_token(), new_token()
+        reservation = reserve(self.product.pk, 6, mine)
+
+        self.assertEqual(reservation.available, 4)
+        self.assertEqual(available_to_sell(self.product), 4)
+        self.assertEqual(available_to_sell(self.product, exclude_token=mine), 10)
+        with self.assertRaises(ReservationError) as ctx:
+            reserve(self.product.pk, 5, theirs)
+        self.assertEqual(ctx.exception.available, 4)
+
+    def test_re_reserving_replaces_the_hold_and_zero_releases_it(self):
+        token = new_token()
+        reserve(self.product.pk, 6, token)
+        reserve(self.product.pk, 2, token)
+        self.assertEqual(StockReservation.objects.get(token=token).quantity, 2)
+
+        reserve(self.product.pk, 0, token)
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertEqual(available_to_sell(self.product), 10)
+
+    def test_expired_holds_stop_counting_and_are_swept(self):
+        token = new_token()
+        reserve(self.product.pk, 8, token)
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(available_to_sell(self.product), 10)
+        reserve(self.product.pk, 10, new_token())
+        self.assertEqual(sweep_expired_reservations(), 1)
+        self.assertFalse(StockReservation.objects.filter(token=token).exists())
+
+    def test_checkout_consumes_its_own_hold(self):
+        token = new_token()
+        reserve(self.product.pk, 7, token)
+
+        checkout_cart([(self.product.pk, 7)], 'cash', reservation_token=token)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 3)
+        self.assertFalse(StockReservation.objects.filter(token=token).exists())
+
+    def test_checkout_cannot_sell_units_held_by_another_sale(self):
+        reserve(self.product.pk, 7, new_token())
+
+        with self.assertRaises(CheckoutError) as ctx:
+            checkout_cart([(self.product.pk, 4)], 'cash', reservation_token=new_token())
+        self.assertEqual(ctx.exception.errors, ["Only 3 Rice available in stock."])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 10)
+
+    def test_reserve_endpoint_reports_conflicts_with_409(self):
+        user = CustomUser.objects.create(username='clerk', email='clerk@test.local', phone_number='1')
+        self.client.force_login(user)
+        reserve(self.product.pk, 9, new_token())
+        url = reverse('reserve_stock', args=[self.product.pk])
+
+        response = self.client.post(url, {'token': new_token(), 'quantity': 2})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['available'], 1)
+
+    def test_price_lookup_reports_stock_less_other_holds(self):
+        user = CustomUser.objects.create(username='clerk', email='clerk@test.local', phone_number='1')
+        self.client.force_login(user)
+        mine = new_token()
+        reserve(self.product.pk, 6, new_token())
+        reserve(self.product.pk, 3, mine)
+        url = reverse('price_lookup', args=[self.product.pk])
+
+        self.assertEqual(self.client.get(url).json()['available'], 1)
+        data = self.client.get(url, {'token': mine}).json()
+        self.assertEqual((data['stock'], data['available']), (10, 4))
+
+
+class ProductAutocompleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_prefix_match_ignores_case(self):
+        for name in ('Classic Rice', 'classic soap', 'Premium Classic'):
+            make_product(name=name)
+        user = CustomUser.objects.create(username='clerk', email='clerk@test.local', phone_number='1')
+        self.client.force_login(user)
+
+        response = self.client.get(reverse('product_autocomplete'), {'q': 'CLASSIC'})
+
+        self.assertEqual([p['name'] for p in response.context['products']], ['Classic Rice', 'classic soap'])
+
+
+class ProductImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_import_over_existing_product_invalidates_list_etag_and_row(self):
+        product = make_product(name='Rice', price=10, stock=10)
+        user = CustomUser.objects.create(username='clerk', email='clerk@test.local', phone_number='1')
+        self.client.force_login(user)
+        self.client.get(reverse('product_list'))  # sets the CSRF cookie the ETag covers
+        first = self.client.get(reverse('product_list'))
+        self.assertNotContains(first, '987.65')
+        self.assertEqual(self.client.get(reverse('product_list'), HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        sheet = BytesIO()
+        pd.DataFrame([{'name': 'rice', 'price': 987.65, 'stock_quantity': 5}]).to_excel(sheet, index=False)
+        sheet.seek(0)
+        self.assertEqual(import_products_from_excel(sheet)['updated'], 1)
+
+        response = self.client.get(reverse('product_list'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '987.65')
+        product.refresh_from_db()
+        self.assertEqual(product.stock_quantity, 15)
+
+
+class CacheNamespaceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = make_product(stock=10)
+
+    def bumped(self, write):
+        namespaces = ('products', 'catalog', 'categories')
+        before = dict(zip(namespaces, app_cache.versions(namespaces)))
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+        after = dict(zip(namespaces, app_cache.versions(namespaces)))
+        return {ns for ns in namespaces if after[ns] != before[ns]}
+
+    def test_stock_movement_keeps_catalog_and_categories(self):
+        self.assertEqual(
+            self.bumped(lambda: StockTransaction.objects.create(product=self.product, transaction_type='IN', quantity=5)),
+            {'products'},
+        )
+        self.assertEqual(self.bumped(lambda: checkout_cart([(self.product.pk, 2)], 'cash')), {'products'})
 
-# Create your tests here.
+    def test_rename_bumps_catalog_and_category_write_bumps_categories(self):
+        def rename():
+            self.product.name = 'Brown Rice'
+            self.product.save()
+        self.assertEqual(self.bumped(rename), {'products', 'catalog'})
+        self.assertEqual(self.bumped(lambda: Category.objects.create(name='Spices')), {'products', 'categories'})
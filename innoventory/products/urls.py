@@ -13,4 +13,7 @@ urlpatterns = [
     path('low-stock-modal/', views.low_stock_modal, name='low_stock_modal'),
     path('export/low-stock/', views.export_low_stock_products_excel, name='export_low_stock'),
     path('transactions/delete/<int:transaction_id>/', views.delete_transaction, name='delete_transaction'),
+    path('<int:pk>/price/', views.price_lookup, name='price_lookup'),
+    path('<int:pk>/reserve/', views.reserve_stock, name='reserve_stock'),
+    path('autocomplete/', views.product_autocomplete, name='product_autocomplete'),
 ]
\ No newline at end of file
@@ -1,9 +1,13 @@
 # utils.py
 import pandas as pd
 from django.db import transaction
+from django.utils import timezone
 from .models import Product, Category
 from suppliers.models import Supplier
+from core import cache as app_cache
+from core.metrics import track_job, record_job_rows
 
+@track_job('import_products')
 def import_products_from_excel(file):
     default_supplier, _ = Supplier.objects.get_or_create(
         name='Unknown Supplier',
@@ -56,6 +60,8 @@ def import_products_from_excel(file):
                 product.price = price
                 product.category = category
                 product.supplier = supplier
+                # bulk_update() skips auto_now; list ETags and row fragments key on it.
+                product.date_modified = timezone.now()
                 products_to_update.append(product)
             else:
                 product = Product(
@@ -79,9 +85,12 @@ def import_products_from_excel(file):
         if products_to_update:
             Product.objects.bulk_update(
                 products_to_update,
-                ['stock_quantity', 'price', 'category', 'supplier']
+                ['stock_quantity', 'price', 'category', 'supplier', 'date_modified']
             )
             updated += len(products_to_update)
+        app_cache.bump('products', 'reports', 'catalog')
+
+    record_job_rows('import_products', created + updated + skipped)
 
     return {
         'created': created,
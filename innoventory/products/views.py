@@ -1,4 +1,7 @@
+import hashlib
 from datetime import timedelta
+from django.conf import settings
+from core import cache as app_cache
 from django.utils import timezone
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
@@ -8,9 +11,16 @@ from django.views.decorators.http import require_POST
 from django.shortcuts import get_object_or_404, render
 from django.http import HttpResponse
 from .forms import ProductForm
-from django.db.models import Q, ProtectedError
+from django.db.models import Count, Max, Q, ProtectedError
+from django.db.models.functions import Upper
 from .models import Product, Category, StockTransaction
 from .utils import import_products_from_excel, generate_low_stock_excel
+from .pricing import get_price_info
+from .reservations import ReservationError, reserve, reserved_quantities
+from .categories import get_categories
+from core.conditional import conditional_page
+from django.http import Http404
+from django.utils.cache import patch_cache_control, quote_etag
 from suppliers.utils import import_suppliers_from_excel
 from .forms import StockTransactionForm
 from django.contrib import messages
@@ -21,10 +31,18 @@ def export_low_stock_products_excel(request):
     products = Product.objects.low_stock().select_related('supplier')
     return generate_low_stock_excel(products)
 
+def _product_list_validator(request):
+    return (
+        Product.objects.order_by().aggregate(changed=Max('date_modified'), count=Count('pk')),
+        get_categories(),
+    )
+
 @login_required
+@conditional_page(_product_list_validator)
 def product_list(request):
-    products = Product.objects.all()
-    categories = Category.objects.all().order_by('name')
+    # Rows render from cached fragments; on a miss the row needs category and supplier.
+    products = Product.objects.select_related('category', 'supplier')
+    categories = get_categories()
     
     search_query = request.GET.get('search', '')
     category_filter = request.GET.get('category', '')
@@ -130,10 +148,6 @@ def product_modal(request, pk=None):
         else:
             form = ProductForm(post_data)
         
-        category_choices = [('', '---------'), ('__new__', '➕ Add New Category')]
-        category_choices.extend([(cat.id, cat.name) for cat in Category.objects.all().order_by('name')])
-        form.fields['category'].choices = category_choices
-
         if form.is_valid():
             form.save()
             return HttpResponse('''
@@ -314,10 +328,6 @@ def product_modal_threshold(request, pk=None):
         else:
             form = ProductForm(post_data)
 
-        category_choices = [('', '---------'), ('__new__', '➕ Add New Category')]
-        category_choices.extend([(cat.id, cat.name) for cat in Category.objects.all().order_by('name')])
-        form.fields['category'].choices = category_choices
-
         if form.is_valid():
             form.save()
             return HttpResponse('''
@@ -341,3 +351,69 @@ def low_stock_modal(request):
         "low_stock_products": low_stock_products
     })
 
+@login_required
+def price_lookup(request, pk):
+    info = get_price_info(pk)
+    if info is None:
+        raise Http404
+    # Holds change without a product write, so they are read live; the
+    # caller's own hold (its reservation token) still counts as sellable.
+    held = reserved_quantities([pk], exclude_token=request.GET.get('token')).get(pk, 0)
+    available = max(info['stock'] - held, 0)
+    etag = quote_etag(f"{info['etag']}-{available}")
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponse(status=304)
+    else:
+        response = JsonResponse({'id': info['id'], 'price': info['price'], 'stock': info['stock'], 'available': available})
+    response['ETag'] = etag
+    # Revalidate each time: stock and holds move, but an unchanged product costs a 304.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+@login_required
+@require_POST
+def reserve_stock(request, pk):
+    """Hold (or with quantity 0, release) stock for the sale identified by `token`."""
+    token = request.POST.get('token', '')
+    try:
+        quantity = int(request.POST.get('quantity', 0))
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'Invalid quantity'}, status=400)
+    if not token or len(token) > 64:
+        return JsonResponse({'error': 'Missing reservation token'}, status=400)
+    try:
+        reservation = reserve(pk, quantity, token, user=request.user)
+    except Product.DoesNotExist:
+        raise Http404
+    except ReservationError as e:
+        return JsonResponse({'error': str(e), 'available': e.available}, status=409)
+    if reservation is None:
+        return JsonResponse({'reserved': 0})
+    return JsonResponse({
+        'reserved': reservation.quantity,
+        'available': reservation.available,
+        'expires_at': reservation.expires_at.isoformat(),
+    })
+
+@login_required
+def product_autocomplete(request):
+    query = ' '.join(request.GET.get('q', '').split())
+    limit = getattr(settings, 'AUTOCOMPLETE_LIMIT', 10)
+    # Prefix match on UPPER(name) so product_name_upper_idx can serve it
+    # (istartswith would wrap the column in a cast no index matches).
+    # Names only, so the entry sits in "catalog" and survives sales and stock movements.
+    products = app_cache.get_or_set(
+        'catalog',
+        f"autocomplete:{hashlib.md5(query.lower().encode()).hexdigest()}",
+        lambda: list(
+            Product.objects.annotate(name_upper=Upper('name'))
+            .filter(name_upper__startswith=query.upper())
+            .order_by('name')
+            .values('product_id', 'name')[:limit]
+        ),
+        getattr(settings, 'AUTOCOMPLETE_CACHE_TTL', 60),
+    )
+    return render(request, 'products/partials/product_autocomplete_results.html', {
+        'products': products,
+        'query': query,
+    })
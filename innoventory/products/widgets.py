@@ -0,0 +1,22 @@
+from django import forms
+
+from .models import Product
+
+
+class ProductAutocompleteWidget(forms.Widget):
+    """
+    Search-as-you-type product picker.
+
+    Renders a hidden input holding the product id plus a search box that
+    loads matching products on demand, instead of a <select> with the whole
+    catalog.
+    """
+    template_name = 'products/widgets/product_autocomplete.html'
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        label = ''
+        if value not in (None, ''):
+            label = Product.objects.filter(pk=value).values_list('name', flat=True).first() or ''
+        context['widget']['label'] = label
+        return context
@@ -7,4 +7,7 @@ app_name = 'reports'
 urlpatterns = [
     path('', admin_required(views.report_dashboard), name='dashboard'),
     path('export-excel/', admin_required(views.export_excel), name='export_excel'),
+    path('collections/', admin_required(views.collections_report), name='collections'),
+    path('aging/', admin_required(views.aging_report), name='aging'),
+    path('aging/export/', admin_required(views.export_aging), name='export_aging'),
 ]
@@ -1,63 +1,30 @@
 from django.shortcuts import render
-from django.db.models import Sum
-from sales.models import Sale
-from products.models import Product, Category
-from datetime import datetime
+from core import cache as app_cache
+from django.db.models import Count, FloatField, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from sales.models import Payment, Sale, SaleLine
+from products.models import Product
+from products.categories import get_categories
+from datetime import datetime, timedelta
 from django.db.models import Sum
 from django.http import HttpResponse
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment
+from core.metrics import track_job, record_job_rows
+from core.conditional import conditional_page
 
+@track_job('export_excel')
 def export_excel(request):
     # Re-run the filtered query to get fresh data
-    start_date = _parse_date_or_none(request.GET.get('start_date'))
-    end_date = _parse_date_or_none(request.GET.get('end_date'))
-    product_q = request.GET.get('product', '').strip()
-    category_q = request.GET.get('category', '').strip()
-
-    sales_qs = Sale.objects.select_related('product_sold')
-
-    if start_date:
-        sales_qs = sales_qs.filter(sales_date__date__gte=start_date)
-    if end_date:
-        sales_qs = sales_qs.filter(sales_date__date__lte=end_date)
-    if product_q:
-        sales_qs = sales_qs.filter(product_sold__name__icontains=product_q)
-    if category_q:
-        sales_qs = sales_qs.filter(product_sold__category__name__icontains=category_q)
-
-    # Get date list and prepare summaries
-    date_list = (
-        sales_qs
-        .values_list('sales_date__date', flat=True)
-        .distinct()
-        .order_by('sales_date__date')
-    )
-
-    summaries = []
-    for d in date_list:
-        day_qs = sales_qs.filter(sales_date__date=d)
-        total_sales = day_qs.count()
-        total_revenue = day_qs.aggregate(total=Sum('total'))['total'] or 0
-
-        top = (
-            day_qs.values('product_sold__name')
-            .annotate(qty=Sum('product_qty'))
-            .order_by('-qty')
-            .first()
-        )
-        top_product = top['product_sold__name'] if top else ''
-
-        summaries.append({
-            'date': d,
-            'total_sales': total_sales,
-            'total_revenue': total_revenue,
-            'top_product': top_product,
-        })
+    start_date, end_date, product_q, category_q = _report_filters(request)
+    lines_qs = _filtered_lines(start_date, end_date, product_q, category_q)
+    summaries = _daily_summaries(lines_qs)
 
     # Calculate totals
-    grand_total_sales = sales_qs.count()
-    grand_total_revenue = sales_qs.aggregate(total=Sum('total'))['total'] or 0
+    grand = lines_qs.aggregate(sales=Count('sale', distinct=True), revenue=Sum('line_total'))
+    grand_total_sales = grand['sales']
+    grand_total_revenue = grand['revenue'] or 0
 
     # Create workbook
     wb = Workbook()
@@ -118,6 +85,7 @@ def export_excel(request):
     response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
 
     wb.save(response)
+    record_job_rows('export_excel', len(summaries))
     return response
 
 def _parse_date_or_none(value):
@@ -129,74 +97,90 @@ def _parse_date_or_none(value):
         return None
 
 
-def report_dashboard(request):
-    # Filters
-    start_date = _parse_date_or_none(request.GET.get('start_date'))
-    end_date = _parse_date_or_none(request.GET.get('end_date'))
-    product_q = request.GET.get('product', '').strip()
-    category_q = request.GET.get('category', '').strip()
+def _report_filters(request):
+    return (
+        _parse_date_or_none(request.GET.get('start_date')),
+        _parse_date_or_none(request.GET.get('end_date')),
+        request.GET.get('product', '').strip(),
+        request.GET.get('category', '').strip(),
+    )
 
-    sales_qs = Sale.objects.select_related('product_sold')
 
+def _filtered_lines(start_date, end_date, product_q, category_q):
+    """Sale lines matching the report filters; cart sales count under each product they contain."""
+    lines_qs = SaleLine.objects.all()
     if start_date:
-        sales_qs = sales_qs.filter(sales_date__date__gte=start_date)
+        lines_qs = lines_qs.filter(sale__sales_date__date__gte=start_date)
     if end_date:
-        sales_qs = sales_qs.filter(sales_date__date__lte=end_date)
+        lines_qs = lines_qs.filter(sale__sales_date__date__lte=end_date)
     if product_q:
-        sales_qs = sales_qs.filter(product_sold__name__icontains=product_q)
+        lines_qs = lines_qs.filter(product__name__icontains=product_q)
     if category_q:
-        sales_qs = sales_qs.filter(product_sold__category__name__icontains=category_q)
-
-    # Aggregate per date summary
-    date_list = (
-        sales_qs
-        .values_list('sales_date__date', flat=True)
-        .distinct()
-        .order_by('sales_date__date')
+        lines_qs = lines_qs.filter(product__category__name__icontains=category_q)
+    return lines_qs
+
+
+def _daily_summaries(lines_qs):
+    """Sales, revenue and best-selling product per day, oldest first."""
+    days = (
+        lines_qs
+        .annotate(date=TruncDate('sale__sales_date'))
+        .values('date')
+        .annotate(total_sales=Count('sale', distinct=True), total_revenue=Sum('line_total'))
+        .order_by('date')
     )
+    top_products = {}
+    per_product = (
+        lines_qs
+        .annotate(date=TruncDate('sale__sales_date'))
+        .values('date', 'product__name')
+        .annotate(qty=Sum('quantity'))
+        .order_by('date', '-qty', 'product__name')
+    )
+    for row in per_product:
+        top_products.setdefault(row['date'], row['product__name'])
+    return [
+        {
+            'date': day['date'],
+            'total_sales': day['total_sales'],
+            'total_revenue': day['total_revenue'] or 0,
+            'top_product': top_products.get(day['date'], ''),
+        }
+        for day in days
+    ]
 
-    summaries = []
-    for d in date_list:
-        day_qs = sales_qs.filter(sales_date__date=d)
-        total_sales = day_qs.count()
-        total_revenue = day_qs.aggregate(total=Sum('total'))['total'] or 0
-
-        # top product of the day
-        top = (
-            day_qs.values('product_sold__name')
-            .annotate(qty=Sum('product_qty'))
-            .order_by('-qty')
-            .first()
-        )
-        top_product = top['product_sold__name'] if top else ''
 
-        summaries.append({
-            'date': d,
-            'total_sales': total_sales,
-            'total_revenue': total_revenue,
-            'top_product': top_product,
-        })
+def _report_dashboard_validator(request):
+    return (
+        Sale.objects.order_by().aggregate(last=Max('sale_id'), changed=Max('sales_date'), count=Count('pk')),
+        Product.objects.order_by().aggregate(changed=Max('date_modified')),
+        get_categories(),
+    )
+
 
-    grand_total_sales = sales_qs.count()
-    grand_total_revenue = sales_qs.aggregate(total=Sum('total'))['total'] or 0
+@conditional_page(_report_dashboard_validator)
+def report_dashboard(request):
+    # Filters
+    start_date, end_date, product_q, category_q = _report_filters(request)
+    lines_qs = _filtered_lines(start_date, end_date, product_q, category_q)
+    summaries = _daily_summaries(lines_qs)
 
+    grand = lines_qs.aggregate(sales=Count('sale', distinct=True), revenue=Sum('line_total'))
     top_overall = (
-        sales_qs.values('product_sold__name')
-        .annotate(qty=Sum('product_qty'))
+        lines_qs.values('product__name')
+        .annotate(qty=Sum('quantity'))
         .order_by('-qty')
         .first()
     )
-    grand_top_product = top_overall['product_sold__name'] if top_overall else ''
-
     totals = {
-        "total_sales": grand_total_sales,
-        "total_revenue": grand_total_revenue,
-        "top_product": grand_top_product,
+        "total_sales": grand['sales'],
+        "total_revenue": grand['revenue'] or 0,
+        "top_product": top_overall['product__name'] if top_overall else '',
     }
 
     # Provide choices for filters
     products = Product.objects.order_by('name')[:200]
-    categories = Category.objects.order_by('name')
+    categories = get_categories()
 
     context = {
         'summaries': summaries,
@@ -213,3 +197,141 @@ def report_dashboard(request):
     }
 
     return render(request, 'reports/report_dashboard.html', context)
+
+
+def collections_report(request):
+    start_date = _parse_date_or_none(request.GET.get('start_date'))
+    end_date = _parse_date_or_none(request.GET.get('end_date'))
+
+    payments_qs = Payment.objects.all()
+    if start_date:
+        payments_qs = payments_qs.filter(payment_date__gte=start_date)
+    if end_date:
+        payments_qs = payments_qs.filter(payment_date__lte=end_date)
+
+    by_day = (
+        payments_qs
+        .values('payment_date')
+        .annotate(total=Sum('amount'), payments=Count('id'))
+        .order_by('-payment_date')
+    )
+    by_staff = (
+        payments_qs
+        .values('received_by__username')
+        .annotate(total=Sum('amount'), payments=Count('id'))
+        .order_by('-total')
+    )
+    totals = payments_qs.aggregate(total=Sum('amount'), payments=Count('id'))
+
+    context = {
+        'by_day': by_day,
+        'by_staff': by_staff,
+        'totals': totals,
+        'filters': {
+            'start_date': start_date,
+            'end_date': end_date,
+        },
+        'page_title': 'Collections',
+    }
+    return render(request, 'reports/collections_report.html', context)
+
+
+AGING_BUCKETS = [
+    ('current', 'Current'),
+    ('days_1_30', '1-30 days'),
+    ('days_31_60', '31-60 days'),
+    ('days_61_90', '61-90 days'),
+    ('days_90_plus', '90+ days'),
+]
+AGING_CACHE_TIMEOUT = 300
+
+
+def _aging_report(today):
+    """Outstanding credit balances per customer, bucketed by days past due, in one grouped query."""
+    return app_cache.get_or_set(
+        'credits', f'aging:{today.isoformat()}', lambda: _build_aging_report(today), AGING_CACHE_TIMEOUT
+    )
+
+
+def _build_aging_report(today):
+    zero = Value(0.0, output_field=FloatField())
+    bucket_filters = {
+        'current': Q(due_date__isnull=True) | Q(due_date__gte=today),
+        'days_1_30': Q(due_date__lt=today, due_date__gte=today - timedelta(days=30)),
+        'days_31_60': Q(due_date__lt=today - timedelta(days=30), due_date__gte=today - timedelta(days=60)),
+        'days_61_90': Q(due_date__lt=today - timedelta(days=60), due_date__gte=today - timedelta(days=90)),
+        'days_90_plus': Q(due_date__lt=today - timedelta(days=90)),
+    }
+    rows = list(
+        Sale.objects
+        .filter(sales_type='credit', balance__gt=0)
+        .values('customer_id', 'customer__name')
+        .annotate(
+            total=Sum('balance'),
+            sales=Count('pk'),
+            **{key: Coalesce(Sum('balance', filter=q), zero) for key, q in bucket_filters.items()},
+        )
+        .order_by('-total')
+    )
+
+    totals = {key: 0.0 for key, _ in AGING_BUCKETS}
+    totals.update(total=0.0, sales=0)
+    for row in rows:
+        row['customer'] = row.pop('customer__name') or 'Unassigned'
+        for key in totals:
+            totals[key] += row[key]
+
+    return {'rows': rows, 'totals': totals, 'as_of': today}
+
+
+def aging_report(request):
+    report = _aging_report(timezone.localdate())
+    context = {
+        'report': report,
+        'buckets': AGING_BUCKETS,
+        'bucket_totals': [(label, report['totals'][key]) for key, label in AGING_BUCKETS],
+        'page_title': 'Credit Aging',
+    }
+    return render(request, 'reports/aging_report.html', context)
+
+
+@track_job('export_aging')
+def export_aging(request):
+    report = _aging_report(timezone.localdate())
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Credit Aging"
+
+    header_font = Font(bold=True)
+    header_fill = PatternFill(start_color="f8f9fa", end_color="f8f9fa", fill_type="solid")
+    total_font = Font(bold=True, color="FFFFFF")
+    total_fill = PatternFill(start_color="343a40", end_color="343a40", fill_type="solid")
+
+    ws.column_dimensions['A'].width = 30
+    for column in 'BCDEFGH':
+        ws.column_dimensions[column].width = 15
+
+    ws.append(["Customer", "Open Sales"] + [label for _, label in AGING_BUCKETS] + ["Total"])
+    for cell in ws[1]:
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = Alignment(horizontal='center')
+
+    for row in report['rows']:
+        ws.append([row['customer'], row['sales']] + [round(row[key], 2) for key, _ in AGING_BUCKETS] + [round(row['total'], 2)])
+
+    totals = report['totals']
+    ws.append(["TOTAL", totals['sales']] + [round(totals[key], 2) for key, _ in AGING_BUCKETS] + [round(totals['total'], 2)])
+    for cell in ws[ws.max_row]:
+        cell.font = total_font
+        cell.fill = total_fill
+        cell.alignment = Alignment(horizontal='center')
+
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    response['Content-Disposition'] = f'attachment; filename="credit_aging_{report["as_of"]:%Y%m%d}.xlsx"'
+    wb.save(response)
+    record_job_rows('export_aging', len(report['rows']))
+    return response
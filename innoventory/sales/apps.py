@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class SalesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sales'
+
+    def ready(self):
+        if getattr(settings, 'OVERDUE_SWEEPER_IN_PROCESS', False):
+            from . import scheduler
+            scheduler.start()
@@ -1,10 +1,12 @@
 from django import forms
 from .models import Sale
 from products.models import Product
+from products.widgets import ProductAutocompleteWidget
+from products.reservations import available_to_sell
 
 
 class CreateSaleForm(forms.Form):
-    product = forms.ModelChoiceField(queryset=Product.objects.all(), label="Product")
+    product = forms.ModelChoiceField(queryset=Product.objects.all(), label="Product", widget=ProductAutocompleteWidget)
     quantity = forms.IntegerField(min_value=1, label="Quantity")
     sales_type = forms.ChoiceField(choices=Sale.SALES_TYPE_CHOICES, label="Sales Type")
     price = forms.FloatField(label="Price", required=False, disabled=True)
@@ -14,8 +16,11 @@ class CreateSaleForm(forms.Form):
         quantity = self.cleaned_data['quantity']
         product = self.cleaned_data.get('product')
 
-        if product and quantity > product.stock_quantity:
-            raise forms.ValidationError(f"Only {product.stock_quantity} items available in stock")
+        if product:
+            # Units held by other open sales are not sellable.
+            available = available_to_sell(product, exclude_token=self.data.get('reservation_token'))
+            if quantity > available:
+                raise forms.ValidationError(f"Only {max(available, 0)} items available in stock")
         return quantity
 
     def clean(self):
@@ -29,7 +34,7 @@ class CreateSaleForm(forms.Form):
 
 
 class SaleForm(forms.ModelForm):
-    product = forms.ModelChoiceField(queryset=Product.objects.all(), label="Product", required=False)
+    product = forms.ModelChoiceField(queryset=Product.objects.all(), label="Product", required=False, widget=ProductAutocompleteWidget)
     quantity = forms.IntegerField(min_value=1, label="Quantity", required=False)
     sales_type = forms.ChoiceField(choices=Sale.SALES_TYPE_CHOICES, label="Sales Type", required=False)
     price = forms.FloatField(label="Price", required=False, disabled=True)
@@ -37,7 +42,8 @@ class SaleForm(forms.ModelForm):
     
     class Meta: 
         model = Sale
-        fields = ['customer_name', 'customer_contact', 'due_date', 'payment_status', 'payment_notes', 'amount_paid']
+        # amount_paid is not editable: payments go through record_payment so the ledger stays in sync.
+        fields = ['customer_name', 'customer_contact', 'due_date', 'payment_status', 'payment_notes']
         widgets = {
             'due_date': forms.DateInput(attrs={'type': 'date'}),
             'payment_notes': forms.Textarea(attrs={'rows': 3}),
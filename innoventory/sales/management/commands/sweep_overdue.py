@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sales.services import sweep_overdue_credits
+
+
+class Command(BaseCommand):
+    help = "Mark unpaid credit sales past their due date as overdue. Run once a day (e.g. from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Treat this YYYY-MM-DD as today.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **opts):
+        today = None
+        if opts['date']:
+            try:
+                today = datetime.strptime(opts['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError("--date must be YYYY-MM-DD")
+        updated = sweep_overdue_credits(today=today, batch_size=opts['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Marked {updated} credit sale(s) as overdue."))
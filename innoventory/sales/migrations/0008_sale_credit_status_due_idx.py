@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0013_alter_stocktransaction_options_and_more'),
+        ('sales', '0007_alter_sale_product_sold'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['sales_type', 'payment_status', 'due_date'], name='sale_credit_status_due_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:46
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0008_sale_credit_status_due_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Payment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.FloatField()),
+                ('payment_date', models.DateField(default=django.utils.timezone.localdate)),
+                ('note', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('received_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payments_received', to=settings.AUTH_USER_MODEL)),
+                ('sale', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='sales.sale')),
+            ],
+            options={
+                'ordering': ['-payment_date', '-created_at'],
+                'indexes': [models.Index(fields=['payment_date'], name='payment_date_idx'), models.Index(fields=['received_by', 'payment_date'], name='payment_staff_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+import re
+from datetime import datetime
+
+from django.db import migrations
+
+# record_payment used to append lines like
+# "2025-11-20 - Payment: ₱150.0 - partial payment" to Sale.payment_notes.
+NOTE_LINE = re.compile(r'^(\d{4}-\d{2}-\d{2}) - Payment: ₱([\d.,]+) - ?(.*)$')
+
+
+def backfill_payments(apps, schema_editor):
+    Sale = apps.get_model('sales', 'Sale')
+    Payment = apps.get_model('sales', 'Payment')
+
+    payments = []
+    for sale in Sale.objects.exclude(payment_notes='').only('sale_id', 'payment_notes').iterator():
+        for line in sale.payment_notes.splitlines():
+            match = NOTE_LINE.match(line.strip())
+            if not match:
+                continue
+            try:
+                payment_date = datetime.strptime(match.group(1), '%Y-%m-%d').date()
+                amount = float(match.group(2).replace(',', ''))
+            except ValueError:
+                continue
+            payments.append(Payment(sale_id=sale.sale_id, amount=amount, payment_date=payment_date, note=match.group(3)))
+    Payment.objects.bulk_create(payments, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0009_payment'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_payments, migrations.RunPython.noop),
+    ]
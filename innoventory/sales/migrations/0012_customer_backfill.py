@@ -0,0 +1,65 @@
+from django.db import migrations
+from django.db.models import FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def _key(name):
+    return ' '.join((name or '').split()).lower()
+
+
+def link_customers(apps, schema_editor):
+    """Create one Customer per distinct (case/whitespace-insensitive) name and point sales at it."""
+    Sale = apps.get_model('sales', 'Sale')
+    Customer = apps.get_model('sales', 'Customer')
+
+    # key -> (display name, latest contact, raw name variants)
+    groups = {}
+    rows = (
+        Sale.objects.exclude(customer_name='')
+        .order_by('sale_id')
+        .values_list('customer_name', 'customer_contact')
+        .iterator()
+    )
+    for name, contact in rows:
+        key = _key(name)
+        if not key:
+            continue
+        display, last_contact, variants = groups.get(key, (' '.join(name.split()), '', set()))
+        variants.add(name)
+        groups[key] = (display, contact or last_contact, variants)
+
+    Customer.objects.bulk_create(
+        [Customer(name=display, name_key=key, contact=contact) for key, (display, contact, _) in groups.items()],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    ids = dict(Customer.objects.values_list('name_key', 'pk'))
+    for key, (_, _, variants) in groups.items():
+        Sale.objects.filter(customer_name__in=variants, customer__isnull=True).update(customer_id=ids[key])
+
+    open_balance = (
+        Sale.objects
+        .filter(customer=OuterRef('pk'), sales_type='credit', balance__gt=0)
+        .order_by()
+        .values('customer')
+        .annotate(total=Sum('balance'))
+        .values('total')
+    )
+    Customer.objects.update(
+        outstanding_balance=Coalesce(Subquery(open_balance), Value(0.0), output_field=FloatField())
+    )
+
+
+def unlink_customers(apps, schema_editor):
+    apps.get_model('sales', 'Sale').objects.update(customer=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0011_customer'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_customers, unlink_customers),
+    ]
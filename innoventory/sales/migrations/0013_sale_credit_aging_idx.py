@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0013_alter_stocktransaction_options_and_more'),
+        ('sales', '0012_customer_backfill'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['sales_type', 'due_date', 'balance'], name='sale_credit_aging_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0014_product_name_index'),
+        ('sales', '0013_sale_credit_aging_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaleLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('unit_price', models.FloatField()),
+                ('line_total', models.FloatField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='sale_lines', to='products.product')),
+                ('sale', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='sales.sale')),
+            ],
+            options={
+                'ordering': ['pk'],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def backfill_lines(apps, schema_editor):
+    """Give every single-product sale recorded before SaleLine existed its one line."""
+    Sale = apps.get_model('sales', 'Sale')
+    SaleLine = apps.get_model('sales', 'SaleLine')
+
+    missing = (
+        Sale.objects.filter(product_sold__isnull=False, lines__isnull=True)
+        .values_list('sale_id', 'product_sold_id', 'product_qty', 'total')
+        .order_by('sale_id')
+    )
+    batch = []
+    for sale_id, product_id, qty, total in missing.iterator(chunk_size=2000):
+        batch.append(SaleLine(
+            sale_id=sale_id,
+            product_id=product_id,
+            quantity=qty,
+            unit_price=round(total / qty, 2) if qty else total,
+            line_total=total,
+        ))
+        if len(batch) >= 2000:
+            SaleLine.objects.bulk_create(batch)
+            batch = []
+    SaleLine.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0014_saleline'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_lines, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,46 @@ from django.db import models
 from django.conf import settings
 from products.models import Product
 from django.utils import timezone
+from django.db.models import OuterRef, Subquery, Sum, Value, FloatField
+from django.db.models.functions import Coalesce
+
+
+class Customer(models.Model):
+    name = models.CharField(max_length=200)
+    # Lowercased, whitespace-collapsed name used to match free-text entries.
+    name_key = models.CharField(max_length=200, unique=True)
+    contact = models.CharField(max_length=200, blank=True)
+    outstanding_balance = models.FloatField(default=0.00, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    @staticmethod
+    def key_for(name):
+        return ' '.join((name or '').split()).lower()
+
+    @classmethod
+    def refresh_balances(cls, customer_ids):
+        """Recompute outstanding_balance from the customers' open credit sales in one UPDATE."""
+        customer_ids = [pk for pk in set(customer_ids) if pk]
+        if not customer_ids:
+            return
+        open_balance = (
+            Sale.objects
+            .filter(customer=OuterRef('pk'), sales_type='credit', balance__gt=0)
+            .order_by()
+            .values('customer')
+            .annotate(total=Sum('balance'))
+            .values('total')
+        )
+        cls.objects.filter(pk__in=customer_ids).update(
+            outstanding_balance=Coalesce(Subquery(open_balance), Value(0.0), output_field=FloatField())
+        )
+
+    def __str__(self):
+        return self.name
+
 
 class Sale(models.Model):
     SALES_TYPE_CHOICES = [
@@ -30,6 +70,7 @@ class Sale(models.Model):
     sold_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
     
     # for credit tracking
+    customer = models.ForeignKey(Customer, on_delete=models.SET_NULL, null=True, blank=True, related_name='sales')
     customer_name = models.CharField(max_length=200, blank=True)
     customer_contact = models.CharField(max_length=200, blank=True)
     due_date = models.DateField(null=True, blank=True)
@@ -38,6 +79,19 @@ class Sale(models.Model):
     payment_status = models.CharField(max_length=20, choices=PAYMENT_STATUS_CHOICES, default='pending')
     payment_notes = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['sales_type', 'payment_status', 'due_date'], name='sale_credit_status_due_idx'),
+            models.Index(fields=['customer', '-sales_date'], name='sale_customer_date_idx'),
+            models.Index(fields=['sales_type', 'due_date', 'balance'], name='sale_credit_aging_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_customer_id = instance.__dict__.get('customer_id')
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.balance:
             self.balance = self.total
@@ -60,6 +114,62 @@ class Sale(models.Model):
                 self.payment_status = 'overdue'
         
         super().save(*args, **kwargs)
+        Customer.refresh_balances([self.customer_id, getattr(self, '_loaded_customer_id', None)])
+        self._loaded_customer_id = self.customer_id
+
+    def delete(self, *args, **kwargs):
+        customer_id = self.customer_id
+        result = super().delete(*args, **kwargs)
+        Customer.refresh_balances([customer_id])
+        return result
+
+    @property
+    def item_label(self):
+        # Cart sales spread over several SaleLines and leave product_sold empty.
+        if self.product_sold_id:
+            return self.product_sold.name
+        return f"Cart ({self.product_qty} items)"
+
+    def __str__(self):
+        if not self.product_sold_id:
+            return f"Sale {self.sale_id} - {self.item_label}"
+        return f"Sale {self.sale_id} - {self.product_sold.name} x {self.product_qty}"
+
+
+class SaleLine(models.Model):
+    sale = models.ForeignKey(Sale, on_delete=models.CASCADE, related_name='lines')
+    product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name='sale_lines')
+    quantity = models.PositiveIntegerField()
+    unit_price = models.FloatField()
+    line_total = models.FloatField()
+
+    class Meta:
+        ordering = ['pk']
+
+    def __str__(self):
+        return f"{self.product.name} x {self.quantity}"
+
+
+class Payment(models.Model):
+    sale = models.ForeignKey(Sale, on_delete=models.CASCADE, related_name='payments')
+    amount = models.FloatField()
+    payment_date = models.DateField(default=timezone.localdate)
+    received_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='payments_received'
+    )
+    note = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-payment_date', '-created_at']
+        indexes = [
+            models.Index(fields=['payment_date'], name='payment_date_idx'),
+            models.Index(fields=['received_by', 'payment_date'], name='payment_staff_date_idx'),
+        ]
 
     def __str__(self):
-        return f"Sale {self.sale_id} - {self.product_sold.name} x {self.product_qty}"
\ No newline at end of file
+        return f"Payment ₱{self.amount} for Sale {self.sale_id}"
@@ -0,0 +1,62 @@
+"""
+In-process daily scheduler for deployments without cron.
+
+Enabled with OVERDUE_SWEEPER_IN_PROCESS; each worker starts one daemon thread
+that runs the overdue sweep at startup and after every local midnight. The
+cache lock keeps workers sharing a cache from sweeping the same day twice.
+"""
+import logging
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def seconds_until_next_day(now=None):
+    now = now or timezone.localtime()
+    tomorrow = timezone.make_aware(datetime.combine(now.date() + timedelta(days=1), datetime.min.time()))
+    return max(1.0, (tomorrow - now).total_seconds() + 5)
+
+
+def run_daily_jobs():
+    from .services import sweep_overdue_credits
+
+    today = timezone.localdate()
+    if not cache.add(f'sales:overdue-sweep:{today.isoformat()}', True, 60 * 60 * 24):
+        return
+    close_old_connections()
+    try:
+        updated = sweep_overdue_credits(today=today)
+        logger.info("Overdue sweep for %s marked %s sale(s)", today, updated)
+    except Exception:
+        cache.delete(f'sales:overdue-sweep:{today.isoformat()}')
+        logger.exception("Overdue sweep failed")
+    finally:
+        close_old_connections()
+
+
+def _loop():
+    while True:
+        run_daily_jobs()
+        time.sleep(seconds_until_next_day())
+
+
+def start():
+    global _started
+    # Management commands (migrate, shell, ...) should not spawn the thread.
+    if sys.argv[0].endswith('manage.py') and sys.argv[1:2] != ['runserver']:
+        return
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=_loop, name='overdue-sweeper', daemon=True).start()
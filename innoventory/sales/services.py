@@ -0,0 +1,257 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core import cache as app_cache
+from products.models import Product, StockTransaction
+from products.reservations import release, reserved_quantities
+
+from .models import Customer, Payment, Sale, SaleLine
+
+
+class PaymentError(ValueError):
+    pass
+
+
+class CheckoutError(ValueError):
+    def __init__(self, errors):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+def get_customer(name, contact=''):
+    """Find the customer a free-text name refers to, creating it on first use."""
+    key = Customer.key_for(name)
+    if not key:
+        return None
+    customer, created = Customer.objects.get_or_create(
+        name_key=key,
+        defaults={'name': ' '.join(name.split()), 'contact': contact or ''},
+    )
+    if contact and not created and customer.contact != contact:
+        Customer.objects.filter(pk=customer.pk).update(contact=contact)
+        customer.contact = contact
+    return customer
+
+
+def credit_summary(queryset=None, today=None):
+    """Outstanding, receivable and overdue figures for credit sales in one query."""
+    today = today or timezone.localdate()
+    if queryset is None:
+        queryset = Sale.objects.filter(sales_type='credit')
+
+    outstanding = Q(balance__gt=0)
+    overdue = Q(due_date__lt=today, balance__gt=0)
+    zero = Value(0.0, output_field=FloatField())
+
+    return queryset.order_by().aggregate(
+        total_receivable=Coalesce(Sum('total'), zero),
+        total_balance=Coalesce(Sum('balance', filter=outstanding), zero),
+        overdue_balance=Coalesce(Sum('balance', filter=overdue), zero),
+        credit_count=Count('pk'),
+        outstanding_count=Count('pk', filter=outstanding),
+        overdue_count=Count('pk', filter=overdue),
+        pending_count=Count('pk', filter=~Q(payment_status='paid')),
+    )
+
+
+def sweep_overdue_credits(today=None, batch_size=1000):
+    """Flip unpaid credit sales past their due date to overdue, in batches."""
+    today = today or timezone.localdate()
+    stale = (
+        Sale.objects
+        .filter(sales_type='credit', due_date__lt=today, balance__gt=0)
+        .exclude(payment_status='overdue')
+        .order_by('pk')
+    )
+    updated = 0
+    while True:
+        ids = list(stale.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            if updated:
+                app_cache.bump('sales', 'credits')
+            return updated
+        updated += Sale.objects.filter(pk__in=ids).update(payment_status='overdue')
+
+
+def record_payment(sale, amount, user=None, payment_date=None, note=''):
+    """
+    Apply a payment to a credit sale and log it in the Payment ledger.
+
+    The balance is changed with a single conditional UPDATE, so concurrent
+    payments cannot overwrite each other or push the balance below zero.
+    """
+    if amount <= 0:
+        raise PaymentError("Payment amount must be greater than zero.")
+
+    today = timezone.localdate()
+    with transaction.atomic():
+        # payment_status comes first: MySQL evaluates SET clauses left to
+        # right, so it must read the balance before it is reduced.
+        updated = Sale.objects.filter(pk=sale.pk, balance__gte=amount).update(
+            payment_status=Case(
+                When(balance__lte=amount, then=Value('paid')),
+                When(due_date__lt=today, then=Value('overdue')),
+                default=Value('partial'),
+            ),
+            balance=Case(
+                When(balance__lte=amount, then=Value(0.0)),
+                default=F('balance') - amount,
+                output_field=FloatField(),
+            ),
+            amount_paid=F('amount_paid') + amount,
+        )
+        if not updated:
+            raise PaymentError("Payment exceeds the outstanding balance.")
+        Customer.refresh_balances([sale.customer_id])
+
+        return Payment.objects.create(
+            sale_id=sale.pk,
+            amount=amount,
+            payment_date=payment_date or today,
+            received_by=user,
+            note=note,
+        )
+
+
+def allocate_customer_payment(customer, amount, user=None, payment_date=None, note=''):
+    """
+    Spread one lump-sum payment over a customer's open credit sales, oldest due first.
+
+    The open sales are locked, balances are recomputed in Python and written
+    back with a single bulk_update, and one Payment row is logged per sale
+    touched. Returns the created payments.
+    """
+    if amount <= 0:
+        raise PaymentError("Payment amount must be greater than zero.")
+
+    today = timezone.localdate()
+    payment_date = payment_date or today
+    with transaction.atomic():
+        open_sales = list(
+            Sale.objects.select_for_update()
+            .filter(customer=customer, sales_type='credit', balance__gt=0)
+            .order_by(F('due_date').asc(nulls_last=True), 'sales_date', 'sale_id')
+        )
+        outstanding = sum(sale.balance for sale in open_sales)
+        if amount > outstanding + 0.005:
+            raise PaymentError("Payment exceeds the customer's outstanding balance.")
+
+        remaining = amount
+        changed = []
+        payments = []
+        for sale in open_sales:
+            if remaining <= 0:
+                break
+            applied = min(remaining, sale.balance)
+            remaining = round(remaining - applied, 2)
+            sale.amount_paid += applied
+            sale.balance = round(sale.balance - applied, 2)
+            if sale.balance <= 0:
+                sale.balance = 0
+                sale.payment_status = 'paid'
+            elif sale.due_date and sale.due_date < today:
+                sale.payment_status = 'overdue'
+            else:
+                sale.payment_status = 'partial'
+            changed.append(sale)
+            payments.append(Payment(
+                sale=sale,
+                amount=applied,
+                payment_date=payment_date,
+                received_by=user,
+                note=note,
+            ))
+
+        Sale.objects.bulk_update(changed, ['amount_paid', 'balance', 'payment_status'], batch_size=500)
+        Payment.objects.bulk_create(payments, batch_size=500)
+        Customer.refresh_balances([customer.pk])
+        app_cache.bump('sales', 'credits', 'reports')
+        return payments
+
+
+def checkout_cart(items, sales_type, user=None, customer_name='', customer_contact='', due_date=None,
+                  reservation_token=None):
+    """
+    Record a whole basket as one Sale with a SaleLine per product.
+
+    ``items`` is a list of (product_id, quantity) pairs; repeated products are
+    merged. The products are locked once, every line is validated before
+    anything is written, and lines, ledger entries and stock deltas are
+    written with one bulk query each. Stock held by other open sales is not
+    sellable; holds under ``reservation_token`` are consumed by this sale.
+    Raises CheckoutError listing every problem if any line cannot be sold.
+    """
+    quantities = {}
+    for product_id, qty in items:
+        quantities[product_id] = quantities.get(product_id, 0) + qty
+    if not quantities:
+        raise CheckoutError(["Add at least one product to the cart."])
+
+    with transaction.atomic():
+        # Locking in primary-key order keeps concurrent checkouts from deadlocking.
+        products = {
+            p.pk: p for p in Product.objects.select_for_update().filter(pk__in=quantities).order_by('pk')
+        }
+        held = reserved_quantities(list(products), exclude_token=reservation_token)
+        errors = []
+        for product_id, qty in quantities.items():
+            product = products.get(product_id)
+            if product is None:
+                errors.append(f"Product {product_id} does not exist.")
+                continue
+            available = product.stock_quantity - held.get(product_id, 0)
+            if qty > available:
+                errors.append(f"Only {max(available, 0)} {product.name} available in stock.")
+        if errors:
+            raise CheckoutError(errors)
+
+        lines = [
+            SaleLine(
+                product=products[product_id],
+                quantity=qty,
+                unit_price=products[product_id].price,
+                line_total=round(products[product_id].price * qty, 2),
+            )
+            for product_id, qty in quantities.items()
+        ]
+        total = round(sum(line.line_total for line in lines), 2)
+        sale = Sale(
+            product_sold=lines[0].product if len(lines) == 1 else None,
+            product_qty=sum(quantities.values()),
+            total=total,
+            sales_type=sales_type,
+            sold_by=user,
+        )
+        if sales_type == 'credit':
+            sale.balance = total
+            sale.due_date = due_date
+            sale.customer_name = customer_name
+            sale.customer_contact = customer_contact
+            sale.customer = get_customer(customer_name, customer_contact)
+        sale.save()
+
+        for line in lines:
+            line.sale = sale
+        SaleLine.objects.bulk_create(lines)
+        StockTransaction.objects.bulk_create([
+            StockTransaction(
+                product_id=line.product_id,
+                transaction_type='OUT',
+                quantity=line.quantity,
+                remarks=f"SALE - {sales_type.upper()} - Sale ID: {sale.sale_id}",
+            )
+            for line in lines
+        ])
+        Product.objects.filter(pk__in=quantities).update(
+            stock_quantity=Case(
+                *[When(pk=product_id, then=F('stock_quantity') - qty) for product_id, qty in quantities.items()],
+                output_field=IntegerField(),
+            ),
+            date_modified=timezone.now(),
+        )
+        if reservation_token:
+            release(reservation_token)
+        app_cache.bump('products', 'reports')
+        return sale
@@ -1,3 +1,230 @@
+import importlib
+from datetime import timedelta
+from unittest import mock
+
+from django.apps import apps
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from products.models import Category, Product, StockTransaction
+from suppliers.models import Supplier
+
+from .models import Customer, Payment, Sale
+from .services import (
+    CheckoutError, PaymentError, allocate_customer_payment, checkout_cart, get_customer, record_payment,
+)
+
+
+def make_product(name='Rice', price=10, stock=100):
+    supplier = Supplier.objects.get_or_create(name='Test Supplier', defaults={'contact': 'n/a', 'email': 's@test.local'})[0]
+    category = Category.objects.get_or_create(name='Test Category')[0]
+    return Product.objects.create(name=name, category=category, supplier=supplier, price=price, stock_quantity=stock)
+
+
+def make_user(username='staff', role='staff'):
+    return CustomUser.objects.create(username=username, email=f'{username}@test.local', phone_number=username, role=role)
+
+
+def make_credit_sale(total=100, customer_name='Ana Santos', due_in_days=7, product=None):
+    product = product or make_product()
+    return Sale.objects.create(
+        product_sold=product,
+        product_qty=1,
+        total=total,
+        sales_type='credit',
+        customer=get_customer(customer_name),
+        customer_name=customer_name,
+        due_date=timezone.localdate() + timedelta(days=due_in_days),
+    )
+
+
+class RecordPaymentTests(TestCase):
+    def test_partial_then_full_payment_updates_sale_ledger_and_customer(self):
+        sale = make_credit_sale(total=100)
+
+        record_payment(sale, 40)
+        sale.refresh_from_db()
+        self.assertEqual((sale.amount_paid, sale.balance, sale.payment_status), (40, 60, 'partial'))
+        self.assertEqual(Customer.objects.get(pk=sale.customer_id).outstanding_balance, 60)
+
+        record_payment(sale, 60)
+        sale.refresh_from_db()
+        self.assertEqual((sale.amount_paid, sale.balance, sale.payment_status), (100, 0, 'paid'))
+        self.assertEqual(Customer.objects.get(pk=sale.customer_id).outstanding_balance, 0)
+        self.assertEqual(sorted(Payment.objects.filter(sale=sale).values_list('amount', flat=True)), [40, 60])
+
+    def test_overpayment_and_non_positive_amounts_are_rejected(self):
+        sale = make_credit_sale(total=50)
+        with self.assertRaises(PaymentError):
+            record_payment(sale, 50.01)
+        with self.assertRaises(PaymentError):
+            record_payment(sale, 0)
+        sale.refresh_from_db()
+        self.assertEqual(sale.balance, 50)
+        self.assertFalse(Payment.objects.exists())
+
+    def test_partial_payment_on_overdue_sale_stays_overdue(self):
+        sale = make_credit_sale(total=100, due_in_days=-3)
+        record_payment(sale, 10)
+        sale.refresh_from_db()
+        self.assertEqual(sale.payment_status, 'overdue')
+
+
+class AllocateCustomerPaymentTests(TestCase):
+    def setUp(self):
+        product = make_product()
+        # Created out of due-date order on purpose.
+        self.later = make_credit_sale(total=50, due_in_days=10, product=product)
+        self.oldest = make_credit_sale(total=30, due_in_days=-5, product=product)
+        self.middle = make_credit_sale(total=40, due_in_days=2, product=product)
+        self.customer = self.oldest.customer
+
+    def test_payment_is_applied_oldest_due_first(self):
+        payments = allocate_customer_payment(self.customer, 50, note='lump sum')
+
+        self.assertEqual([(p.sale_id, p.amount) for p in payments], [(self.oldest.pk, 30), (self.middle.pk, 20)])
+        for sale in (self.oldest, self.middle, self.later):
+            sale.refresh_from_db()
+        self.assertEqual((self.oldest.balance, self.oldest.payment_status), (0, 'paid'))
+        self.assertEqual((self.middle.balance, self.middle.amount_paid, self.middle.payment_status), (20, 20, 'partial'))
+        self.assertEqual((self.later.balance, self.later.amount_paid), (50, 0))
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.outstanding_balance, 70)
+
+    def test_overpayment_is_rejected_without_side_effects(self):
+        with self.assertRaises(PaymentError):
+            allocate_customer_payment(self.customer, 120.01)
+        with self.assertRaises(PaymentError):
+            allocate_customer_payment(self.customer, -5)
+        self.assertFalse(Payment.objects.exists())
+        self.assertEqual(sorted(Sale.objects.values_list('balance', flat=True)), [30, 40, 50])
+
+    def test_exact_outstanding_settles_every_sale(self):
+        allocate_customer_payment(self.customer, 120)
+        self.assertFalse(Sale.objects.filter(balance__gt=0).exists())
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.outstanding_balance, 0)
+
+
+class PaymentBackfillTests(TestCase):
+    def test_payment_note_lines_become_payments(self):
+        sale = make_credit_sale(total=300)
+        Sale.objects.filter(pk=sale.pk).update(payment_notes=(
+            "2025-11-20 - Payment: ₱150.0 - partial payment\n"
+            "free-form remark\n"
+            "2025-11-25 - Payment: ₱1,000.50 - \n"
+        ))
+        migration = importlib.import_module('sales.migrations.0010_payment_backfill')
+        migration.backfill_payments(apps, None)
+
+        payments = list(Payment.objects.filter(sale=sale).order_by('payment_date').values_list('payment_date', 'amount', 'note'))
+        self.assertEqual(payments, [
+            (timezone.datetime(2025, 11, 20).date(), 150.0, 'partial payment'),
+            (timezone.datetime(2025, 11, 25).date(), 1000.5, ''),
+        ])
+
+
+class QuickPaidTests(TestCase):
+    def setUp(self):
+        # Cached users and pages outlive a test: TestCase never commits, so no bump clears them.
+        cache.clear()
+        self.client.force_login(make_user())
+
+    def test_settles_the_remaining_balance(self):
+        sale = make_credit_sale(total=80)
+        response = self.client.post(reverse('quick_paid', args=[sale.pk]), HTTP_HX_REQUEST='true')
+        self.assertEqual(response.status_code, 200)
+        sale.refresh_from_db()
+        self.assertEqual((sale.balance, sale.payment_status), (0, 'paid'))
+
+    def test_concurrent_payment_conflict_returns_409_instead_of_500(self):
+        sale = make_credit_sale(total=80)
+        with mock.patch('sales.views.record_sale_payment', side_effect=PaymentError('changed')):
+            response = self.client.post(reverse('quick_paid', args=[sale.pk]))
+            self.assertEqual(response.status_code, 409)
+            response = self.client.post(reverse('quick_paid', args=[sale.pk]), HTTP_HX_REQUEST='true')
+            self.assertContains(response, 'balance changed')
+
+
+class EditCreditSaleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_amount_paid_cannot_be_edited_outside_the_payment_ledger(self):
+        self.client.force_login(make_user())
+        sale = make_credit_sale(total=100)
+        self.client.post(reverse('edit_credit_sale', args=[sale.pk]), {
+            'customer_name': sale.customer_name,
+            'customer_contact': '',
+            'due_date': sale.due_date.isoformat(),
+            'payment_status': sale.payment_status,
+            'payment_notes': '',
+            'amount_paid': '100',
+        })
+        sale.refresh_from_db()
+        self.assertEqual((sale.amount_paid, sale.balance), (0, 100))
+
+
+class CheckoutCartTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.rice = make_product(name='Rice', price=12.5, stock=10)
+        self.soap = make_product(name='Soap', price=3, stock=4)
+
+    def test_multi_line_sale_writes_lines_ledger_and_stock(self):
+        sale = checkout_cart([(self.rice.pk, 2), (self.soap.pk, 3), (self.rice.pk, 1)], 'cash')
+
+        self.assertIsNone(sale.product_sold_id)
+        self.assertEqual((sale.product_qty, sale.total, sale.payment_status), (6, 46.5, 'paid'))
+        lines = {line.product_id: (line.quantity, line.unit_price, line.line_total) for line in sale.lines.all()}
+        self.assertEqual(lines, {self.rice.pk: (3, 12.5, 37.5), self.soap.pk: (3, 3, 9)})
+        self.assertEqual(
+            sorted(StockTransaction.objects.filter(transaction_type='OUT').values_list('product_id', 'quantity')),
+            sorted([(self.rice.pk, 3), (self.soap.pk, 3)]),
+        )
+        self.rice.refresh_from_db()
+        self.soap.refresh_from_db()
+        self.assertEqual((self.rice.stock_quantity, self.soap.stock_quantity), (7, 1))
+
+    def test_single_line_sale_keeps_product_sold(self):
+        sale = checkout_cart([(self.soap.pk, 1)], 'cash')
+        self.assertEqual(sale.product_sold_id, self.soap.pk)
+
+    def test_every_invalid_line_is_reported_and_nothing_is_written(self):
+        with self.assertRaises(CheckoutError) as ctx:
+            checkout_cart([(self.rice.pk, 11), (self.soap.pk, 5), (999999, 1)], 'cash')
+
+        self.assertEqual(ctx.exception.errors, [
+            "Only 10 Rice available in stock.",
+            "Only 4 Soap available in stock.",
+            "Product 999999 does not exist.",
+        ])
+        self.assertFalse(Sale.objects.exists())
+        self.assertFalse(StockTransaction.objects.exists())
+        self.rice.refresh_from_db()
+        self.assertEqual(self.rice.stock_quantity, 10)
+
+    def test_credit_cart_opens_a_balance_for_the_customer(self):
+        due = timezone.localdate() + timedelta(days=14)
+        sale = checkout_cart([(self.rice.pk, 2), (self.soap.pk, 1)], 'credit', customer_name='Ana Santos', due_date=due)
+
+        self.assertEqual((sale.balance, sale.payment_status, sale.due_date), (28, 'pending', due))
+        self.assertEqual(Customer.objects.get(pk=sale.customer_id).outstanding_balance, 28)
+
+    def test_reports_count_cart_revenue_under_each_product(self):
+        checkout_cart([(self.rice.pk, 2), (self.soap.pk, 1)], 'cash')
+        checkout_cart([(self.soap.pk, 2)], 'cash')
+        self.client.force_login(make_user(role='admin'))
+
+        totals = self.client.get(reverse('reports:dashboard')).context['totals']
+        self.assertEqual((totals['total_sales'], totals['total_revenue'], totals['top_product']), (2, 34, 'Soap'))
+
+        rice_only = self.client.get(reverse('reports:dashboard'), {'product': 'rice'}).context['totals']
+        self.assertEqual((rice_only['total_sales'], rice_only['total_revenue']), (1, 25))
 
-# Create your tests here.
+        dashboard = self.client.get(reverse('admin_dashboard')).context
+        self.assertEqual([p['product__name'] for p in dashboard['top_selling']], ['Soap', 'Rice'])
+        self.assertEqual(dashboard['total_revenue'], 34)
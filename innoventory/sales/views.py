@@ -4,68 +4,52 @@ from django.urls import reverse
 from django.views.decorators.http import require_POST
 from django.http import HttpResponse, JsonResponse
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import Count, F, Max, Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 import json
 from django.contrib import messages
 from products.models import Product
 from .forms import SaleForm, CreateSaleForm
-from .models import Sale
+from .models import Customer, Payment, Sale
+from .services import allocate_customer_payment, checkout_cart, CheckoutError, credit_summary, get_customer, PaymentError, record_payment as record_sale_payment
 from products.models import StockTransaction
+from products.reservations import new_token
+from core.badges import get_badge_counts
+from core.idempotency import idempotent
+from core.conditional import conditional_page
 from django.core.paginator import Paginator
 
 
 @login_required
+@idempotent
 def create_sale(request):
+    reservation_token = request.POST.get('reservation_token') or new_token()
     if request.method == "POST":
         form = CreateSaleForm(request.POST)
         if form.is_valid():
-            product = form.cleaned_data['product']
-            qty = form.cleaned_data['quantity']
             sales_type = form.cleaned_data['sales_type']
-            total = product.price * qty
-
-            sale_data = {
-                'product_sold': product,
-                'product_qty': qty,
-                'total': total,
-                'sales_type': sales_type,
-                'sold_by': request.user,
-            }
-
-            if sales_type == 'credit':
-                sale_data['balance'] = total
-                sale_data['amount_paid'] = 0
-                sale_data['payment_status'] = 'pending'
-
-                due_date_str = request.POST.get('due_date')
-                if due_date_str:
-                    try:
-                        from datetime import datetime
-                        sale_data['due_date'] = datetime.strptime(due_date_str, '%Y-%m-%d').date()
-                    except (ValueError, TypeError):
-                        sale_data['due_date'] = None
-
-                sale_data['customer_name'] = request.POST.get('customer_name', '')
-
-            sale = Sale.objects.create(**sale_data)
-
-            StockTransaction.objects.create(
-                product=product,
-                quantity=qty,
-                transaction_type='OUT',
-                remarks=f"SALE - {sales_type.upper()} - Sale ID: {sale.sale_id}"
-            )
-
-            return HttpResponse(
-                status=204,
-                headers={
-                    'HX-Trigger': json.dumps({
-                        "showMessage": "Sale recorded successfully!",
-                        "reloadPage": True
-                    })
-                }
-            )
+            try:
+                checkout_cart(
+                    [(form.cleaned_data['product'].pk, form.cleaned_data['quantity'])],
+                    sales_type,
+                    user=request.user,
+                    customer_name=request.POST.get('customer_name', '') if sales_type == 'credit' else '',
+                    due_date=parse_date(request.POST.get('due_date') or '') if sales_type == 'credit' else None,
+                    reservation_token=request.POST.get('reservation_token'),
+                )
+            except CheckoutError as e:
+                form.add_error('quantity', '; '.join(e.errors))
+            else:
+                return HttpResponse(
+                    status=204,
+                    headers={
+                        'HX-Trigger': json.dumps({
+                            "showMessage": "Sale recorded successfully!",
+                            "reloadPage": True
+                        })
+                    }
+                )
     else:
         form = SaleForm()
 
@@ -74,10 +58,88 @@ def create_sale(request):
         'modal_title': 'Record New Sale - Fix Errors',
         'form_action': reverse('create_sale'),
         'submit_text': 'Submit',
+        'reservation_token': reservation_token,
     }
     return render(request, 'sales/partials/record_sale_modal.html', context)
 
 @login_required
+@idempotent
+def checkout(request):
+    errors = []
+    rows = [{'product': None, 'quantity': 1}]
+    if request.method == "POST":
+        product_ids = request.POST.getlist('product')
+        quantities = request.POST.getlist('quantity')
+        items = []
+        rows = []
+        for product_id, qty in zip(product_ids, quantities):
+            if not product_id:
+                continue
+            try:
+                items.append((int(product_id), int(qty)))
+            except (ValueError, TypeError):
+                errors.append("Quantities must be whole numbers.")
+                continue
+            if items[-1][1] < 1:
+                errors.append("Quantities must be at least 1.")
+            rows.append({'product': items[-1][0], 'quantity': items[-1][1]})
+
+        sales_type = request.POST.get('sales_type')
+        if sales_type not in dict(Sale.SALES_TYPE_CHOICES):
+            errors.append("Choose a sales type.")
+        customer_name = request.POST.get('customer_name', '').strip()
+        if sales_type == 'credit' and not customer_name:
+            errors.append("Credit sales need a customer name.")
+
+        if not errors:
+            try:
+                sale = checkout_cart(
+                    items,
+                    sales_type,
+                    user=request.user,
+                    customer_name=customer_name,
+                    due_date=parse_date(request.POST.get('due_date') or ''),
+                    reservation_token=request.POST.get('reservation_token'),
+                )
+            except CheckoutError as e:
+                errors = e.errors
+            else:
+                return HttpResponse(
+                    status=204,
+                    headers={
+                        'HX-Trigger': json.dumps({
+                            "showMessage": f"Sale {sale.sale_id} recorded: {sale.product_qty} item(s), ₱{sale.total:,.2f}",
+                            "reloadPage": True
+                        })
+                    }
+                )
+        rows = rows or [{'product': None, 'quantity': 1}]
+
+    widget = CreateSaleForm.base_fields['product'].widget
+    context = {
+        'errors': errors,
+        'rows': [
+            {'picker': widget.render('product', row['product'], {'id': f'id_product_{i}'}), 'quantity': row['quantity']}
+            for i, row in enumerate(rows)
+        ],
+        'empty_picker': widget.render('product', None),
+        'sales_type_choices': Sale.SALES_TYPE_CHOICES,
+        'data': request.POST,
+        'reservation_token': request.POST.get('reservation_token') or new_token(),
+    }
+    return render(request, 'sales/partials/cart_modal.html', context)
+
+def _sales_record_validator(request):
+    return (
+        Sale.objects.order_by().aggregate(last=Max('sale_id'), changed=Max('sales_date'), count=Count('pk')),
+        Payment.objects.order_by().aggregate(last=Max('pk')),
+        Product.objects.order_by().aggregate(changed=Max('date_modified'), count=Count('pk')),
+        # Overdue flips happen without touching a timestamp; they run daily.
+        timezone.localdate(),
+    )
+
+@login_required
+@conditional_page(_sales_record_validator)
 def sales_record(request):
     sales_list = Sale.objects.order_by('-sales_date')
     products_list = Product.objects.all().order_by('name')
@@ -107,35 +169,10 @@ def record_sale_modal(request):
         'modal_title': 'Record New Sale',
         'form_action': reverse('create_sale'),
         'submit_text': 'Submit',
+        'reservation_token': new_token(),
     }
     return render(request, 'sales/partials/record_sale_modal.html', context)
 
-@require_POST
-@login_required
-def calculate_total(request):
-    form = SaleForm(request.POST)
-    product_id = request.POST.get('product')
-    quantity_str = request.POST.get('quantity', '').strip()
-    price = 0
-    total = 0
-
-    if product_id:
-        try:
-            product = Product.objects.get(pk=product_id)
-            qty = int(quantity_str) if quantity_str else 1
-            price = float(product.price)
-            total = price * qty
-        except (Product.DoesNotExist, ValueError, TypeError):
-            form.add_error('quantity', "Invalid input")
-
-    context = {
-        'price': price,
-        'total': total,
-        'form': form,
-    }
-
-    return render(request, 'sales/partials/_combined_total_and_errors.html', context)
-
 @login_required
 def credit_management(request):
     try:
@@ -150,13 +187,6 @@ def credit_management(request):
                 balance__gt=0
             )
 
-        overdue_sales_to_update = Sale.objects.filter(
-            sales_type='credit',
-            due_date__lt=today,
-            balance__gt=0
-        ).exclude(payment_status='overdue')
-        overdue_sales_to_update.update(payment_status='overdue')
-
         overdue_summary = credit_sales.filter(
             Q(due_date__lt=today) & (Q(balance__gt=0) | Q(balance__isnull=True))
         )[:6]
@@ -164,16 +194,16 @@ def credit_management(request):
         for sale in overdue_summary:
             sale.days_overdue = (today - sale.due_date).days
 
-        total_balance = sum(sale.balance or sale.total for sale in credit_sales)
-        total_receivable = sum(sale.total for sale in credit_sales)
+        summary = credit_summary(credit_sales, today)
 
         paginator = Paginator(credit_sales.order_by('-sales_date'), 10)
         page_obj = paginator.get_page(request.GET.get('page'))
 
         context = {
             'page_obj': page_obj,
-            'total_balance': total_balance,
-            'total_receivable': total_receivable,
+            'total_balance': summary['total_balance'],
+            'total_receivable': summary['total_receivable'],
+            'credit_summary': summary,
             'overdue_summary': overdue_summary,
             'today': today,
         }
@@ -191,12 +221,14 @@ def credit_management(request):
         for sale in overdue_summary:
             sale.days_overdue = (today - sale.due_date).days
 
+        summary = credit_summary(credit_sales_error, today)
         credit_sales_error = credit_sales_error[:50]
 
         context = {
             'credit_sales': credit_sales_error,
-            'total_balance': sum(sale.balance or sale.total for sale in credit_sales_error),
-            'total_receivable': sum(sale.total for sale in credit_sales_error),
+            'total_balance': summary['total_balance'],
+            'total_receivable': summary['total_receivable'],
+            'credit_summary': summary,
             'overdue_summary': overdue_summary,
             'today': today,
             'error_occurred': True,
@@ -204,33 +236,36 @@ def credit_management(request):
         return render(request, 'sales/credit_management.html', context)
 
 @login_required
+@idempotent
 def record_payment(request, sale_id):
     sale = get_object_or_404(Sale, sale_id=sale_id)
 
     if request.method == 'POST':
-        payment_amount = float(request.POST.get('payment_amount', 0))
-        payment_date = request.POST.get('payment_date')
+        try:
+            payment_amount = float(request.POST.get('payment_amount', 0))
+        except (TypeError, ValueError):
+            payment_amount = 0
+        payment_date = parse_date(request.POST.get('payment_date') or '') or timezone.localdate()
         payment_notes = request.POST.get('payment_notes', '')
 
-        if 0 < payment_amount <= sale.balance:
-            sale.amount_paid += payment_amount
-            sale.balance = sale.total - sale.amount_paid
-
-            note_entry = f"{payment_date} - Payment: ₱{payment_amount} - {payment_notes}"
-            sale.payment_notes = f"{sale.payment_notes}\n{note_entry}".strip() if sale.payment_notes else note_entry
-
-            sale.save()
-
-            return HttpResponse(status=204, headers={
-                'HX-Trigger': json.dumps({
-                    "creditListChanged": None,
-                    "showMessage": f"Payment of ₱{payment_amount} recorded successfully"
-                })
+        try:
+            record_sale_payment(sale, payment_amount, user=request.user, payment_date=payment_date, note=payment_notes)
+        except PaymentError:
+            return JsonResponse({'success': False, 'message': 'Invalid payment amount'})
+
+        return HttpResponse(status=204, headers={
+            'HX-Trigger': json.dumps({
+                "creditListChanged": None,
+                "showMessage": f"Payment of ₱{payment_amount} recorded successfully"
             })
+        })
 
-        return JsonResponse({'success': False, 'message': 'Invalid payment amount'})
-
-    return render(request, 'sales/partials/payment_modal.html', {'sale': sale, 'today': timezone.now().date()})
+    payments = sale.payments.select_related('received_by')[:20]
+    return render(request, 'sales/partials/payment_modal.html', {
+        'sale': sale,
+        'payments': payments,
+        'today': timezone.now().date(),
+    })
 
 @login_required
 def sale_modal(request, sale_id=None):
@@ -273,12 +308,16 @@ def delete_credit_sale(request, sale_id):
     if request.method == 'POST':
         customer_name = sale.customer_name or "Unknown Customer"
 
-        StockTransaction.objects.create(
-            product=sale.product_sold,
-            quantity=sale.product_qty,
-            transaction_type='IN',
-            remarks=f"CREDIT SALE DELETED - Sale ID: {sale.sale_id} - Customer: {customer_name}"
-        )
+        restock = [(line.product, line.quantity) for line in sale.lines.select_related('product')]
+        if not restock:
+            restock = [(sale.product_sold, sale.product_qty)]
+        for product, quantity in restock:
+            StockTransaction.objects.create(
+                product=product,
+                quantity=quantity,
+                transaction_type='IN',
+                remarks=f"CREDIT SALE DELETED - Sale ID: {sale.sale_id} - Customer: {customer_name}"
+            )
 
         sale.delete()
         messages.success(request, f'Credit sale for {customer_name} deleted successfully!', extra_tags='credit_management')
@@ -296,8 +335,8 @@ def edit_credit_sale_modal(request, sale_id):
         if form.is_valid():
             updated_sale = form.save(commit=False)
 
-            if 'amount_paid' in form.changed_data:
-                updated_sale.balance = updated_sale.total - updated_sale.amount_paid
+            if 'customer_name' in form.changed_data or 'customer_contact' in form.changed_data:
+                updated_sale.customer = get_customer(updated_sale.customer_name, updated_sale.customer_contact)
 
             updated_sale.save()
 
@@ -339,24 +378,38 @@ def overdue_credits_modal(request):
 
     return render(request, "sales/partials/overdue_credits_modal.html", {
         "overdue_summary": overdue_summary,
+        "overdue_count": get_badge_counts()['overdue_credits'],
         "today": today,
     })
 
 @login_required
 @require_POST
+@idempotent
 def quick_paid(request, sale_id):
     sale = get_object_or_404(Sale, pk=sale_id)
-    sale.balance = 0
-    sale.amount_paid = sale.total
-    sale.payment_status = 'paid'
-    sale.save()
+    if sale.balance > 0:
+        try:
+            record_sale_payment(sale, sale.balance, user=request.user, note='Marked as paid')
+        except PaymentError:
+            # Balance changed under us (e.g. a concurrent payment); settle what is left.
+            sale.refresh_from_db()
+            try:
+                if sale.balance > 0:
+                    record_sale_payment(sale, sale.balance, user=request.user, note='Marked as paid')
+            except PaymentError:
+                message = "The balance changed while saving. Please review the sale and try again."
+                if request.headers.get("HX-Request"):
+                    # htmx does not swap 4xx responses, so the warning goes out as a normal fragment.
+                    return HttpResponse(f'''
+                        <div class="alert alert-warning alert-dismissible fade show" role="alert">
+                            {message}
+                            <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+                        </div>
+                    ''')
+                return JsonResponse({"success": False, "error": message}, status=409)
 
     if request.headers.get("HX-Request"):
-        overdue_count = Sale.objects.filter(
-            sales_type='credit',
-            due_date__lt=timezone.now().date(),
-            balance__gt=0
-        ).count()
+        overdue_count = get_badge_counts()['overdue_credits']
 
         response = HttpResponse('''
                 <div class="alert alert-success alert-dismissible fade show" role="alert">
@@ -367,4 +420,85 @@ def quick_paid(request, sale_id):
         response['HX-Trigger'] = f'updateBadge:{overdue_count}'
         return response
 
-    return JsonResponse({"success": True})
\ No newline at end of file
+    return JsonResponse({"success": True})
+
+@login_required
+def customer_list(request):
+    search = request.GET.get('search', '').strip()
+    customers = Customer.objects.all()
+    if search:
+        customers = customers.filter(name_key__startswith=Customer.key_for(search))
+    if request.GET.get('owing'):
+        customers = customers.filter(outstanding_balance__gt=0)
+
+    paginator = Paginator(customers.order_by('-outstanding_balance', 'name'), 20)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    context = {
+        'page_obj': page_obj,
+        'search': search,
+        'owing': bool(request.GET.get('owing')),
+        'page_title': 'Customers',
+    }
+    return render(request, 'sales/customer_list.html', context)
+
+@login_required
+def customer_ledger(request, customer_id):
+    customer = get_object_or_404(Customer, pk=customer_id)
+
+    # Served by sale_customer_date_idx: cost depends on the page, not the history size.
+    sales = customer.sales.select_related('product_sold').order_by('-sales_date')
+    paginator = Paginator(sales, 15)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    payments = (
+        Payment.objects.filter(sale__customer=customer)
+        .select_related('received_by')
+        .order_by('-payment_date', '-created_at')[:10]
+    )
+
+    context = {
+        'customer': customer,
+        'page_obj': page_obj,
+        'payments': payments,
+        'page_title': customer.name,
+    }
+    return render(request, 'sales/customer_ledger.html', context)
+
+@login_required
+@idempotent
+def customer_payment(request, customer_id):
+    customer = get_object_or_404(Customer, pk=customer_id)
+
+    if request.method == 'POST':
+        try:
+            payment_amount = round(float(request.POST.get('payment_amount', 0)), 2)
+        except (TypeError, ValueError):
+            payment_amount = 0
+        payment_date = parse_date(request.POST.get('payment_date') or '') or timezone.localdate()
+        payment_notes = request.POST.get('payment_notes', '')
+
+        try:
+            payments = allocate_customer_payment(
+                customer, payment_amount, user=request.user, payment_date=payment_date, note=payment_notes
+            )
+        except PaymentError as e:
+            return JsonResponse({'success': False, 'message': str(e)})
+
+        return HttpResponse(status=204, headers={
+            'HX-Trigger': json.dumps({
+                "creditListChanged": None,
+                "showMessage": f"Payment of ₱{payment_amount} applied to {len(payments)} sale(s)"
+            })
+        })
+
+    open_sales = (
+        customer.sales.filter(sales_type='credit', balance__gt=0)
+        .select_related('product_sold')
+        .order_by(F('due_date').asc(nulls_last=True), 'sales_date', 'sale_id')[:20]
+    )
+    return render(request, 'sales/partials/customer_payment_modal.html', {
+        'customer': customer,
+        'open_sales': open_sales,
+        'today': timezone.now().date(),
+    })
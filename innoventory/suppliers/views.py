@@ -3,11 +3,21 @@ from datetime import timedelta
 from django.utils import timezone
 from django.http import HttpResponse
 from django.core.paginator import Paginator
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Max
 from .models import Supplier
 from .forms import SupplierForm
 from django.contrib import messages
+from core.conditional import conditional_page
+from products.models import Product
 
+def _supplier_list_validator(request):
+    # Product moves change the per-supplier product counts.
+    return (
+        Supplier.objects.order_by().aggregate(changed=Max('updated_at'), count=Count('pk')),
+        Product.objects.order_by().aggregate(changed=Max('date_modified'), count=Count('pk')),
+    )
+
+@conditional_page(_supplier_list_validator)
 def supplier_list(request):
     suppliers = Supplier.objects.annotate(products_count_annotation=Count('products'))
     